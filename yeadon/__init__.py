@@ -1,11 +1,16 @@
+import importlib.util
+
 from yeadon.human import Human
+from yeadon.population import Population
 from yeadon.ui import start_ui
 from yeadon.version import __version__
 
-try:
-    import mayavi
-except ImportError:
-    pass
-else:
-    del mayavi
-    from yeadon.gui import start_gui
+
+def __getattr__(name):
+    # The GUI, and MayaVi with it, is only imported when it is first used,
+    # since importing MayaVi is slow.
+    if name == 'start_gui' and importlib.util.find_spec('mayavi') is not None:
+        from yeadon.gui import start_gui
+        return start_gui
+    raise AttributeError("module {0!r} has no attribute "
+                         "{1!r}".format(__name__, name))
@@ -1,8 +1,12 @@
 #!/usr/bin/env python
 
-"""Runs the GUI or the UI. The UI is a fallback if MayaVi is not installed."""
+"""Runs the GUI or the UI. The UI is a fallback if MayaVi is not installed.
+The batch command writes the inertial properties of the humans given by many
+measurement files to a table."""
 
 import argparse
+import importlib.util
+import sys
 
 
 def run():
@@ -16,17 +20,45 @@ def run():
     parser.add_argument('-u', '--ui', action="store_true",
                         help='Runs the text based user interface.')
 
+    subparsers = parser.add_subparsers(dest='command')
+    batch_parser = subparsers.add_parser('batch',
+        help='Writes the inertial properties of many humans to a table.',
+        description='Writes the mass, center of mass, and inertia of the '
+                    'human given by each measurement file to a '
+                    'comma-separated table. Files that fail are reported in '
+                    'the error column.')
+    batch_parser.add_argument('measurements', nargs='+',
+                              help='Measurement files, directories of .txt '
+                                   'files, or glob patterns.')
+    batch_parser.add_argument('-c', '--cfg', nargs='+',
+                              help='One configuration file for all humans, '
+                                   'or one per measurement file.')
+    batch_parser.add_argument('-o', '--output',
+                              help='Output file (default: standard output).')
+    batch_parser.add_argument('-j', '--workers', type=int,
+                              help='Number of worker processes (default: '
+                                   'number of processors).')
+    batch_parser.add_argument('--chunksize', type=int, default=1,
+                              help='Number of files sent to a worker at a '
+                                   'time (default: 1).')
+    batch_parser.add_argument('--asymmetric', action='store_true',
+                              help='Do not average the left and right '
+                                   'limbs.')
+    batch_parser.add_argument('--density-set', default='Dempster',
+                              choices=['Dempster', 'Chandler', 'Clauser'],
+                              help='Segmental densities (default: '
+                                   'Dempster).')
+
     args = parser.parse_args()
 
-    try:
-        import mayavi
-    except ImportError:
+    if args.command == 'batch':
+        sys.exit(run_batch(args))
+
+    # MayaVi is only imported if the GUI is started.
+    has_mayavi = importlib.util.find_spec('mayavi') is not None
+    if not has_mayavi:
         print("MayaVi is not installed, resorting to text based user "
               "interface.")
-        has_mayavi = False
-    else:
-        del mayavi
-        has_mayavi = True
 
     if args.ui or not has_mayavi:
         from yeadon.ui import start_ui
@@ -36,5 +68,24 @@ def run():
         start_gui()
 
 
+def run_batch(args):
+    """Runs the batch command with the parsed arguments, and returns the exit
+    status: 1 if any file failed, 0 otherwise."""
+    from yeadon.batch import batch_properties, write_table
+
+    rows = batch_properties(args.measurements, CFG_files=args.cfg,
+                            workers=args.workers, chunksize=args.chunksize,
+                            symmetric=not args.asymmetric,
+                            density_set=args.density_set)
+    if args.output is None:
+        num_rows, num_failed = write_table(rows, sys.stdout)
+    else:
+        with open(args.output, 'w', newline='') as f:
+            num_rows, num_failed = write_table(rows, f)
+    print("Processed {} measurement files; {} failed.".format(num_rows,
+          num_failed), file=sys.stderr)
+    return 1 if num_failed else 0
+
+
 if __name__ == '__main__':
     run()
@@ -0,0 +1,191 @@
+"""The batch module calculates the inertial properties of many humans, one
+per measurement file, in a pool of worker processes, and writes them to a
+single table. A file that cannot be turned into a human is reported in its
+row of the table, and does not stop the others from being processed. This
+module is used by the ``yeadon batch`` command.
+
+"""
+import contextlib
+import csv
+import glob
+import io
+import os
+import warnings
+from concurrent import futures
+
+from .human import Human
+
+# Columns of the table written by write_table. The center of mass is
+# expressed in the global frame, from the bottom center of the pelvis (Ls0),
+# and the inertia is about the center of mass of the human.
+columns = ('measurements', 'CFG', 'mass', 'x', 'y', 'z', 'Ixx', 'Ixy', 'Ixz',
+           'Iyy', 'Iyz', 'Izz', 'messages', 'error')
+
+
+def find_files(paths):
+    """Returns the files given by a list of paths, each of which may be a
+    file, a directory (all of the .txt files in it), or a glob pattern.
+
+    Parameters
+    ----------
+    paths : str or list of str
+        e.g. 'misc/samplemeasurements/*.txt'.
+
+    Returns
+    -------
+    files : list of str
+        The files of each path, sorted, in the order of the paths.
+
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += sorted(glob.glob(os.path.join(path, '*.txt')))
+        elif glob.has_magic(path):
+            files += sorted(f for f in glob.glob(path) if os.path.isfile(f))
+        else:
+            files.append(path)
+    return files
+
+
+def _process_file(task):
+    """Creates the human for one measurement file and returns its row of the
+    table. Runs in a worker process; any exception is caught and reported in
+    the row so that the rest of the batch is unaffected.
+
+    Parameters
+    ----------
+    task : tuple
+        (measurement file, CFG file or None, symmetric, density_set).
+
+    Returns
+    -------
+    row : dict
+        Keyed by the entries of `columns`.
+
+    """
+    meas_file, CFG_file, symmetric, density_set = task
+    row = dict((key, '') for key in columns)
+    row['measurements'] = meas_file
+    row['CFG'] = CFG_file if CFG_file is not None else ''
+    # The model prints and warns about the measurements it fixes; these are
+    # kept with the row instead of being interleaved on the terminal.
+    output = io.StringIO()
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        try:
+            with contextlib.redirect_stdout(output):
+                h = Human(meas_file, CFG=CFG_file, symmetric=symmetric,
+                          density_set=density_set)
+        except Exception as e:
+            row['error'] = '{}: {}'.format(type(e).__name__, e)
+        else:
+            row['mass'] = h.mass
+            row['x'], row['y'], row['z'] = h.center_of_mass[:, 0]
+            for (i, j), name in zip([(0, 0), (0, 1), (0, 2), (1, 1), (1, 2),
+                                     (2, 2)], columns[6:12]):
+                row[name] = h.inertia[i, j]
+    messages = [line.strip() for line in output.getvalue().splitlines()
+                if line.strip()]
+    messages += [str(w.message).strip() for w in caught]
+    row['messages'] = '; '.join(messages)
+    return row
+
+
+def batch_properties(measurement_files, CFG_files=None, workers=None,
+                     chunksize=1, symmetric=True, density_set='Dempster'):
+    """Calculates the mass, center of mass, and inertia of the human given by
+    each measurement file, in a pool of worker processes. The rows are
+    yielded in the order of the files, as soon as they are available.
+
+    Parameters
+    ----------
+    measurement_files : str or list of str
+        Measurement files, directories, or glob patterns; see find_files.
+    CFG_files : str or list of str, optional
+        A single configuration file, used for all humans, or one per
+        measurement file. By default, all humans are in the default
+        configuration.
+    workers : int, optional
+        Number of worker processes. Defaults to the number of processors. If
+        1, the files are processed in this process, without a pool.
+    chunksize : int, optional
+        Number of files sent to a worker at a time. Larger chunks reduce the
+        overhead of communicating with the workers for many small files.
+    symmetric : bool, optional
+        See yeadon.Human.
+    density_set : str, optional
+        See yeadon.Human.
+
+    Returns
+    -------
+    rows : iterator of dict
+        One row per measurement file, keyed by the entries of `columns`. The
+        'error' entry of the row of a file that failed holds the exception,
+        and its properties are empty.
+
+    """
+    measurement_files = find_files(measurement_files)
+    if CFG_files is None or isinstance(CFG_files, str):
+        CFG_files = [CFG_files] * len(measurement_files)
+    else:
+        CFG_files = find_files(CFG_files)
+        if len(CFG_files) == 1:
+            CFG_files = CFG_files * len(measurement_files)
+        elif len(CFG_files) != len(measurement_files):
+            raise ValueError("Give one CFG file, or one per measurement "
+                             "file; got {} for {} measurement files.".format(
+                                 len(CFG_files), len(measurement_files)))
+    if workers is not None and workers < 1:
+        raise ValueError("The number of workers must be at least 1.")
+    if chunksize < 1:
+        raise ValueError("The chunksize must be at least 1.")
+
+    tasks = [(meas_file, CFG_file, symmetric, density_set)
+             for meas_file, CFG_file in zip(measurement_files, CFG_files)]
+    return _rows(tasks, workers, chunksize)
+
+
+def _rows(tasks, workers, chunksize):
+    """Yields the row of each task, in order; see batch_properties."""
+    if workers == 1:
+        for task in tasks:
+            yield _process_file(task)
+    else:
+        with futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            for row in executor.map(_process_file, tasks,
+                                    chunksize=chunksize):
+                yield row
+
+
+def write_table(rows, stream):
+    """Writes rows, as given by batch_properties, to a comma-separated
+    table, one row at a time.
+
+    Parameters
+    ----------
+    rows : iterable of dict
+    stream : file-like object
+        Open for writing text, e.g. sys.stdout.
+
+    Returns
+    -------
+    num_rows : int
+        Number of rows written.
+    num_failed : int
+        Number of rows that have an error.
+
+    """
+    writer = csv.DictWriter(stream, fieldnames=columns)
+    writer.writeheader()
+    num_rows = 0
+    num_failed = 0
+    for row in rows:
+        writer.writerow(row)
+        stream.flush()
+        num_rows += 1
+        if row['error']:
+            num_failed += 1
+    return num_rows, num_failed
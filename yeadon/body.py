@@ -0,0 +1,578 @@
+"""The body module defines the BodyArrays class, which holds the inertial
+properties of all of the solids and segments of a human in contiguous arrays.
+The solids and segments of a yeadon.Human are thin views onto these arrays,
+which allows the properties of the segments and of the whole human to be
+computed with a few vectorized operations. The arrays may also hold the
+properties of many humans at once (see yeadon.population). The user does not
+interact with this module.
+
+"""
+import numpy as np
+
+from . import inertia
+
+
+def combine_properties(masses, centers_of_mass, inertias):
+    """Returns the mass, center of mass, and inertia (about the center of
+    mass) of systems of bodies. The bodies are accumulated in order, as a
+    loop over them would.
+
+    Parameters
+    ----------
+    masses : np.array (..., S)
+        Mass of each of the S bodies of each system.
+    centers_of_mass : np.array (..., S, 3)
+        Center of mass of each body.
+    inertias : np.array (..., S, 3, 3)
+        Inertia of each body about its center of mass, in the same frame as
+        the centers of mass.
+
+    Returns
+    -------
+    mass : np.array (...)
+    center_of_mass : np.array (..., 3)
+    inertia : np.array (..., 3, 3)
+
+    """
+    num_bodies = masses.shape[-1]
+    mass = 0.0
+    moment = 0.0
+    for i in range(num_bodies):
+        mass = mass + masses[..., i]
+        moment = moment + (masses[..., i, np.newaxis] *
+                           centers_of_mass[..., i, :])
+    center_of_mass = moment / mass[..., np.newaxis]
+    # Parallel axis theorem, from each body's COM to the system's COM.
+    shifted = inertia.parallel_axis(inertias, masses,
+            center_of_mass[..., np.newaxis, :] - centers_of_mass)
+    inertia_ = 0.0
+    for i in range(num_bodies):
+        inertia_ = inertia_ + shifted[..., i, :, :]
+    return mass, center_of_mass, inertia_
+
+
+def parallel_axis_shift_derivatives(dists, dist_derivatives):
+    """Returns the derivatives of the matrices that, multiplied by a mass,
+    are added to an inertia by yeadon.inertia.parallel_axis.
+
+    Parameters
+    ----------
+    dists : np.array (..., 3)
+    dist_derivatives : np.array (..., 3)
+        Derivative of dists with respect to some variable.
+
+    Returns
+    -------
+    shift_derivatives : np.array (..., 3, 3)
+
+    """
+    outer = dist_derivatives[..., :, np.newaxis] * dists[..., np.newaxis, :]
+    return (2.0 * np.sum(dists * dist_derivatives, axis=-1)[
+            ..., np.newaxis, np.newaxis] * np.eye(3) -
+            outer - np.swapaxes(outer, -1, -2))
+
+
+def _cross_matrix_product(vectors, matrices):
+    """Returns the product of the cross product matrices of the vectors
+    (..., 3) and the matrices (..., 3, 3), which is the cross product of the
+    vectors and the columns of the matrices. This is faster than np.cross
+    for many small matrices."""
+    return (vectors[..., [1, 2, 0], np.newaxis] * matrices[..., [2, 0, 1], :] -
+            vectors[..., [2, 0, 1], np.newaxis] * matrices[..., [1, 2, 0], :])
+
+
+def combine_properties_jacobian(masses, centers_of_mass, inertias,
+                                rot_mats, moved_bodies, pivots, axes):
+    """Returns the mass, center of mass, and inertia of systems of bodies, as
+    combine_properties does, and the derivatives of the center of mass and
+    inertia of each system with respect to K variables, each of which turns
+    some of the bodies rigidly about an axis, as a joint angle turns the
+    segments distal to the joint. The masses do not depend on the variables.
+
+    The derivatives are found per variable, from sums over the bodies it
+    turns, rather than per (variable, body) pair.
+
+    Parameters
+    ----------
+    masses : np.array (..., S)
+    centers_of_mass : np.array (..., S, 3)
+    inertias : np.array (..., S, 3, 3)
+        See combine_properties. The inertia of each body is that of
+        yeadon.inertia.rotate_inertia, given the body's orientation.
+    rot_mats : np.array (..., S, 3, 3)
+        Orientation of each body.
+    moved_bodies : np.array of bool (K, S)
+        Whether each variable turns each body.
+    pivots : np.array (..., K, 3)
+        A point on the axis of each variable, in the frame of the centers of
+        mass.
+    axes : np.array (..., K, 3)
+        The axis of each variable: the angular velocity of the bodies it
+        turns, per unit rate of the variable.
+
+    Returns
+    -------
+    mass : np.array (...)
+    center_of_mass : np.array (..., 3)
+    inertia : np.array (..., 3, 3)
+    center_of_mass_derivative : np.array (..., K, 3)
+    inertia_derivative : np.array (..., K, 3, 3)
+
+    """
+    mass, center_of_mass, inertia_ = combine_properties(masses,
+            centers_of_mass, inertias)
+    moved = moved_bodies.astype(float)
+    shape = masses.shape[:-1]
+
+    def moved_sum(values):
+        """Sums the values of the bodies turned by each variable."""
+        sums = moved @ values.reshape(shape + (moved.shape[1], -1))
+        return sums.reshape(shape + moved.shape[:1] +
+                            values.shape[len(shape) + 1:])
+
+    # The mass and center of mass of the bodies turned by each variable,
+    # and the inertia of their point masses about that center of mass.
+    moved_mass = masses @ moved.T
+    moved_center_of_mass = (moved_sum(masses[..., np.newaxis] *
+                                      centers_of_mass) /
+                            moved_mass[..., np.newaxis])
+    point_masses = inertia.parallel_axis(np.zeros(3), masses,
+                                         centers_of_mass)
+    point_mass_inertia = inertia.parallel_axis(moved_sum(point_masses),
+            -moved_mass, moved_center_of_mass)
+    moved_center_of_mass_derivative = np.cross(axes,
+                                               moved_center_of_mass - pivots)
+    center_of_mass_derivative = (moved_mass[..., np.newaxis] *
+            moved_center_of_mass_derivative / mass[..., np.newaxis,
+                                                   np.newaxis])
+    # The point masses turn about the axis, so the derivative of their
+    # inertia is W P - P W = X + X^T, with X = W P, in which W is the cross
+    # product matrix of the axis. The inertia of a body, R^T J R, changes
+    # by -(Y + Y^T), with Y = V R^T J R, in which V is the cross product
+    # matrix of R^T times the axis. Y is linear in the axis, with
+    # coefficients ([row e of R] x) R^T J R that are summed over the
+    # bodies turned by each variable.
+    X = _cross_matrix_product(axes, point_mass_inertia)
+    coefficients = moved_sum(_cross_matrix_product(rot_mats,
+            inertias[..., np.newaxis, :, :]))
+    Y = np.einsum('...ke,...keab->...kab', axes, coefficients)
+    # The inertia about the system's center of mass is the inertia of the
+    # bodies about their centers of mass, plus that of their point masses
+    # about the origin, minus that of a point mass at the system's center of
+    # mass.
+    inertia_derivative = (X + np.swapaxes(X, -1, -2) - Y -
+            np.swapaxes(Y, -1, -2) +
+            moved_mass[..., np.newaxis, np.newaxis] *
+            parallel_axis_shift_derivatives(moved_center_of_mass,
+                                            moved_center_of_mass_derivative) -
+            mass[..., np.newaxis, np.newaxis, np.newaxis] *
+            parallel_axis_shift_derivatives(
+                center_of_mass[..., np.newaxis, :],
+                center_of_mass_derivative))
+    return (mass, center_of_mass, inertia_, center_of_mass_derivative,
+            inertia_derivative)
+
+
+class BodyArrays(object):
+    """Struct-of-arrays storage for the solids and segments of a human, or of
+    many humans.
+
+    The configuration-independent (relative) properties are set when the
+    arrays are created. The global properties of the segments are set by
+    calc_segment_properties, and are replaced by new arrays (not modified in
+    place) each time that method is called.
+
+    The arrays of properties have any number of leading dimensions (none for a
+    single human; one, of length M, for a population of M humans), followed
+    by a dimension over the n solids or S segments, followed by the
+    dimensions of the property itself.
+
+    Attributes
+    ----------
+    segment_names : tuple of str (S,)
+        Name of each segment, e.g. 'A1'.
+    build_toward_positive_z : np.array of bool (S,)
+        Whether each segment's solids are stacked in the segment's local +z
+        direction (see yeadon.Segment).
+    solid_labels : tuple of str (n,)
+        Label of each solid. The solids of a segment are contiguous, and the
+        segments are in the order of segment_names.
+    segment_index : np.array of int (n,)
+        Index of the segment that each solid belongs to.
+    density : np.array (..., n)
+        Density of each solid, in units of kg/m^3.
+    height : np.array (..., n)
+        Height of each solid, in units of m.
+    mass : np.array (..., n)
+        Mass of each solid, in units of kg.
+    rel_center_of_mass : np.array (..., n, 3)
+        Center of mass of each solid, expressed in the frame of the solid,
+        from the origin of the solid.
+    rel_inertia : np.array (..., n, 3, 3)
+        Inertia of each solid about its center of mass, expressed in the frame
+        of the solid.
+    volume : np.array (..., n)
+        Volume of each solid, in units of m^3: its mass at unit density.
+    unit_rel_inertia : np.array (..., n, 3, 3)
+        Relative inertia of each solid at unit density. The mass and
+        inertia of the solids at any density are these times the density;
+        the center of mass does not depend on the density.
+    pos_in_segment : np.array (..., n, 3)
+        Position of the origin of each solid, expressed in the frame of its
+        segment, from the origin of the segment.
+    segment_mass : np.array (..., S)
+    segment_rel_center_of_mass : np.array (..., S, 3)
+    segment_rel_inertia : np.array (..., S, 3, 3)
+        Relative properties of the segments; see yeadon.Segment.
+    segment_center_of_mass : np.array (..., S, 3)
+    segment_inertia : np.array (..., S, 3, 3)
+        Global properties of the segments; see yeadon.Segment.
+
+    """
+    def __init__(self, segment_names, build_toward_positive_z, solid_labels,
+                 segment_index, density, height, mass, rel_center_of_mass,
+                 rel_inertia):
+        """Stores the properties of the solids, and calculates the relative
+        properties of the segments. See the class docstring for the
+        parameters.
+
+        """
+        self.segment_names = tuple(segment_names)
+        self.build_toward_positive_z = np.asarray(build_toward_positive_z)
+        self.solid_labels = tuple(solid_labels)
+        self.segment_index = np.asarray(segment_index)
+        self.density = density
+        self.height = height
+        self.mass = mass
+        self.rel_center_of_mass = rel_center_of_mass
+        self.rel_inertia = rel_inertia
+        self.volume = mass / density
+        self.unit_rel_inertia = rel_inertia / density[..., np.newaxis,
+                                                      np.newaxis]
+
+        # Index of the first solid of each segment, and of the solid after
+        # the last.
+        self._segment_bounds = np.searchsorted(self.segment_index,
+                np.arange(len(self.segment_names) + 1))
+        # Index of the k-th solid of each segment, at [k, segment]; segments
+        # with fewer solids are padded with an index one past the last
+        # solid. See _sum_by_segment.
+        counts = np.diff(self._segment_bounds)
+        self._solids_by_position = np.full((counts.max(), len(counts)),
+                                           len(self.segment_index))
+        for k in range(counts.max()):
+            has_kth = counts > k
+            self._solids_by_position[k, has_kth] = \
+                    self._segment_bounds[:-1][has_kth] + k
+        self.calc_pos_in_segment()
+        self.calc_segment_rel_properties()
+
+        self.segment_center_of_mass = np.zeros(self.segment_mass.shape +
+                                               (3,))
+        self.segment_inertia = np.zeros(self.segment_mass.shape + (3, 3))
+
+    @classmethod
+    def from_segments(cls, segments, properties=None):
+        """Stacks the relative properties of the solids of the given segments,
+        and makes the solids views onto the stacked arrays.
+
+        Parameters
+        ----------
+        segments : list of tuples
+            One tuple (name, solids, build_toward_positive_z) per segment,
+            in which solids is the list of yeadon.Solid's that compose the
+            segment, ordered as in the segment.
+        properties : tuple, optional
+            The density (N,), mass (N,), relative center of mass (N, 3), and
+            relative inertia (N, 3, 3) of the N solids, if they are known,
+            e.g., from a snapshot (see yeadon.Human.load_snapshot). These
+            arrays are used as they are, without copying them, and the
+            solids do not calculate their relative properties. By default,
+            the properties are taken from the solids.
+
+        Returns
+        -------
+        arrays : BodyArrays
+
+        """
+        all_solids = [s for name, solids, up in segments for s in solids]
+        if properties is None:
+            properties = (
+                    np.array([s.density for s in all_solids], dtype=float),
+                    np.array([s.mass for s in all_solids], dtype=float),
+                    np.array([s.rel_center_of_mass[:, 0]
+                              for s in all_solids], dtype=float),
+                    np.array([s.rel_inertia for s in all_solids],
+                             dtype=float))
+        density, mass, rel_center_of_mass, rel_inertia = properties
+        arrays = cls([name for name, solids, up in segments],
+                     [up for name, solids, up in segments],
+                     [s.label for s in all_solids],
+                     [index for index, (name, solids, up)
+                      in enumerate(segments) for s in solids],
+                     density,
+                     np.array([s.height for s in all_solids], dtype=float),
+                     mass, rel_center_of_mass, rel_inertia)
+        for index, s in enumerate(all_solids):
+            s._bind(arrays, index)
+        return arrays
+
+    def calc_pos_in_segment(self):
+        """Calculates the position of the origin of each solid relative to
+        the origin of its segment, in the frame of the segment. Solids are
+        stacked along the local z axis of their segment."""
+        self.pos_in_segment = np.zeros(self.height.shape + (3,),
+                                       dtype=self.height.dtype)
+        bounds = self._segment_bounds
+        for start, stop, up in zip(bounds[:-1], bounds[1:],
+                                   self.build_toward_positive_z):
+            heights = np.cumsum(self.height[..., start:stop], axis=-1)
+            if up:
+                self.pos_in_segment[..., start + 1:stop, 2] = \
+                        heights[..., :-1]
+            else:
+                self.pos_in_segment[..., start:stop, 2] = -heights
+
+    def calc_segment_rel_properties(self):
+        """Calculates the mass, relative center of mass, and relative inertia
+        (about the segment's center of mass, in the segment's frame) of all
+        segments from the relative properties of their solids."""
+        com_in_segment = self.pos_in_segment + self.rel_center_of_mass
+        self.segment_mass = self._sum_by_segment(self.mass, -1)
+        self.segment_rel_center_of_mass = (self._sum_by_segment(
+            self.mass[..., np.newaxis] * com_in_segment, -2) /
+            self.segment_mass[..., np.newaxis])
+        # Parallel axis theorem, from each solid's COM to its segment's COM.
+        dist = (com_in_segment -
+                self.segment_rel_center_of_mass[..., self.segment_index, :])
+        self.segment_rel_inertia = self._sum_by_segment(
+                inertia.parallel_axis(self.rel_inertia, self.mass, dist), -3)
+
+    def set_density(self, density):
+        """Sets the density of all solids, and calculates their masses and
+        inertias, and the relative properties of the segments, from the
+        properties of the solids at unit density; the geometry of the solids
+        is not calculated again. Call calc_segment_properties afterwards to
+        update the global properties of the segments.
+
+        Parameters
+        ----------
+        density : array_like (..., n)
+            Density of each solid, in units of kg/m^3.
+
+        """
+        density = np.asarray(density)
+        self.density = np.broadcast_to(density, self.volume.shape).copy()
+        self.mass = self.density * self.volume
+        self.rel_inertia = (self.density[..., np.newaxis, np.newaxis] *
+                            self.unit_rel_inertia)
+        self.calc_segment_rel_properties()
+
+    def scale_density(self, factor):
+        """Multiplies the density of all solids by a factor. The masses and
+        inertias of the solids and segments are linear in the densities, so
+        they are multiplied by the same factor instead of being calculated
+        again; the centers of mass do not change.
+
+        Parameters
+        ----------
+        factor : float or np.array (...)
+            Factor for the solids of each human.
+
+        """
+        factor = np.asarray(factor)
+        per_solid = factor[..., np.newaxis]
+        per_tensor = factor[..., np.newaxis, np.newaxis, np.newaxis]
+        self.density = self.density * per_solid
+        self.mass = self.mass * per_solid
+        self.rel_inertia = self.rel_inertia * per_tensor
+        self.segment_mass = self.segment_mass * per_solid
+        self.segment_rel_inertia = self.segment_rel_inertia * per_tensor
+        self.segment_inertia = self.segment_inertia * per_tensor
+
+    def _sum_by_segment(self, values, axis):
+        """Sums the values of the solids of each segment, accumulating them
+        in the order of the solids in the segment, so that the result does
+        not depend on how numpy would otherwise group the additions.
+
+        Parameters
+        ----------
+        values : np.array
+            One value per solid along `axis`.
+        axis : int
+            Negative index of the solid axis of `values`.
+
+        Returns
+        -------
+        sums : np.array
+            One sum per segment along `axis`.
+
+        """
+        shape = list(values.shape)
+        shape[axis] = 1
+        padded = np.concatenate([values, np.zeros(shape, dtype=values.dtype)],
+                                axis=axis)
+        sums = 0.0
+        for indices in self._solids_by_position:
+            sums = sums + np.take(padded, indices, axis=axis)
+        return sums
+
+    def segment_properties(self, positions, rot_mats):
+        """Returns the center of mass and the inertia (about the segment's
+        center of mass) of all segments in the global frame, for the given
+        segment positions and orientations, without storing them.
+
+        Parameters
+        ----------
+        positions : np.array (..., S, 3)
+            Position of the origin of each segment, in the global frame.
+        rot_mats : np.array (..., S, 3, 3)
+            Orientation of each segment relative to the global frame.
+
+        Returns
+        -------
+        centers_of_mass : np.array (..., S, 3)
+        inertias : np.array (..., S, 3, 3)
+
+        """
+        centers_of_mass = positions + (rot_mats @
+                self.segment_rel_center_of_mass[..., np.newaxis])[..., 0]
+        inertias = inertia.rotate_inertia(rot_mats, self.segment_rel_inertia)
+        return centers_of_mass, inertias
+
+    def solid_poses(self, positions, rot_mats):
+        """Returns the position and orientation of all solids, for the given
+        segment positions and orientations, as yeadon.Segment.set_orientation
+        sets them one solid at a time.
+
+        Parameters
+        ----------
+        positions : np.array (..., S, 3)
+        rot_mats : np.array (..., S, 3, 3)
+            See segment_properties.
+
+        Returns
+        -------
+        pos : np.array (..., n, 3)
+            Position of the origin of each solid, in the global frame.
+        end_pos : np.array (..., n, 3)
+            Position of the other end of each solid, along its z axis.
+        rot_mats : np.array (..., n, 3, 3)
+            Orientation of each solid, that of its segment.
+
+        """
+        solid_rot_mats = rot_mats[..., self.segment_index, :, :]
+        pos = positions[..., self.segment_index, :] + (solid_rot_mats @
+                self.pos_in_segment[..., np.newaxis])[..., 0]
+        end_pos = pos + (self.height[..., np.newaxis] *
+                         solid_rot_mats[..., :, 2])
+        return pos, end_pos, solid_rot_mats
+
+    def solid_properties(self, pos, rot_mats):
+        """Returns the global properties of all solids, as
+        yeadon.Solid.calc_properties calculates them one solid at a time.
+
+        Parameters
+        ----------
+        pos : np.array (..., n, 3)
+        rot_mats : np.array (..., n, 3, 3)
+            Position of the origin and orientation of each solid, in the
+            global frame; see solid_poses.
+
+        Returns
+        -------
+        centers_of_mass : np.array (..., n, 3)
+        inertias : np.array (..., n, 3, 3)
+            Center of mass and inertia of each solid in the global frame.
+
+        """
+        centers_of_mass = pos + (rot_mats @
+                self.rel_center_of_mass[..., np.newaxis])[..., 0]
+        inertias = inertia.rotate_inertia(rot_mats, self.rel_inertia)
+        return centers_of_mass, inertias
+
+    def calc_segment_properties(self, positions, rot_mats):
+        """Calculates and stores the center of mass and the inertia (about
+        the segment's center of mass) of all segments in the global frame.
+        See segment_properties.
+
+        """
+        self.segment_center_of_mass, self.segment_inertia = \
+                self.segment_properties(positions, rot_mats)
+
+
+class BodyMesh(object):
+    """The surface meshes of all solids of a human, packed into one vertex
+    buffer so that the whole body is moved to a new pose by a single batched
+    transform.
+
+    The mesh of each solid is a contiguous block of rows of the buffer. The
+    x, y, and z grids of a solid (see yeadon.Solid.mesh_points) are views
+    onto its block, so they always hold the vertices of the last pose given
+    to update.
+
+    Attributes
+    ----------
+    local_vertices : np.array (V, 3)
+        Vertices in the frame of their solid, from the origin of the solid.
+    vertices : np.array (V, 3)
+        Vertices in the global frame, as of the last call to update. The
+        array is updated in place.
+    solid_index : np.array of int (V,)
+        Index of the solid that each vertex belongs to.
+    offsets : np.array of int (n + 1,)
+        Row of the first vertex of each solid, and the number of vertices.
+
+    """
+    def __init__(self, solids):
+        """Gathers the un-rotated meshes of the given solids.
+
+        Parameters
+        ----------
+        solids : list of yeadon.Solid (n,)
+            The solids, e.g., in the order of yeadon.body.BodyArrays.
+
+        """
+        local_meshes = [s._local_mesh() for s in solids]
+        counts = [mesh[0].size for mesh in local_meshes]
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+        self.solid_index = np.repeat(np.arange(len(solids)), counts)
+        self.local_vertices = np.concatenate(
+                [mesh.reshape((3, -1)).T for mesh in local_meshes])
+        self.vertices = np.zeros_like(self.local_vertices)
+        # The views are made when asked for, so that they stay views onto
+        # the vertices of a copy of the mesh.
+        self._grid_shapes = [mesh.shape[1:] for mesh in local_meshes]
+
+    def update(self, positions, rot_mats):
+        """Moves all vertices to the given poses of the solids.
+
+        Parameters
+        ----------
+        positions : np.array (n, 3)
+            Position of the origin of each solid, in the global frame.
+        rot_mats : np.array (n, 3, 3)
+            Orientation of each solid, in the global frame.
+
+        """
+        np.einsum('vij,vj->vi', rot_mats[self.solid_index],
+                  self.local_vertices, out=self.vertices)
+        self.vertices += positions[self.solid_index]
+
+    def solid_mesh_points(self, index):
+        """Returns the x, y, and z grids of the mesh of a solid, as views onto
+        the vertices.
+
+        Parameters
+        ----------
+        index : int
+            Index of the solid.
+
+        Returns
+        -------
+        x, y, z : np.array (rows, columns)
+
+        """
+        grid = self.vertices[self.offsets[index]:self.offsets[index + 1]]
+        grid = grid.reshape(self._grid_shapes[index] + (3,))
+        return grid[..., 0], grid[..., 1], grid[..., 2]
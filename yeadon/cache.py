@@ -0,0 +1,214 @@
+"""The cache module keeps recently built humans so that a human with the same
+measurements and options is not built again. Creating a yeadon.Human reads
+the measurements, defines all of its solids and segments, and may scale its
+densities by a measured mass; a copy of a cached human costs a fraction of
+that. Humans are keyed by a hash of the measurement values, in meters, and
+the measured mass, so two paths to the same file, a file and its reformatted
+copy, or a file and a dict of the same measurements, share an entry.
+
+The module-level cache is used through cached_human, cache_info, and
+cache_clear. Instances of HumanCache are independent of it. A measurement
+file is read once per lookup, and the human built on a miss is built from
+the measurements read for its key. A copy of a cached human takes the
+measurementconversionfactor of the input it was asked for with.
+
+"""
+import collections
+import copy
+import hashlib
+import threading
+
+from .human import Human
+
+# Statistics of a HumanCache, as returned by HumanCache.info.
+CacheInfo = collections.namedtuple('CacheInfo',
+        ['hits', 'misses', 'evictions', 'maxsize', 'currsize'])
+
+
+def human_key(meas_in, symmetric=True, density_set='Dempster'):
+    """Returns the key under which the human given by the arguments is cached.
+
+    Parameters
+    ----------
+    meas_in : str or dict
+        Path to a measurement file, or a dict of measurements; see
+        yeadon.Human.
+    symmetric : bool, optional
+        See yeadon.Human.
+    density_set : str, optional
+        See yeadon.Human.
+
+    Returns
+    -------
+    key : str
+        Hexadecimal SHA-256 digest of the measurements (in meters), of the
+        measured mass, if any, and of the options.
+
+    """
+    meas, meas_mass, measurementconversionfactor = _read_meas_in(meas_in)
+    return _key(meas, meas_mass, symmetric, density_set)
+
+
+def _read_meas_in(meas_in):
+    """Returns the measurements (in meters), the measured mass (or None),
+    and the measurementconversionfactor given by meas_in, a path to a
+    measurement file or a dict of measurements; see
+    yeadon.Human.read_measurements.
+
+    """
+    if isinstance(meas_in, dict):
+        # As for a dict given to yeadon.Human.
+        return meas_in, None, 1
+    elif isinstance(meas_in, str):
+        return Human.read_measurements(meas_in)
+    raise ValueError("meas_in must be a str or a dict, not "
+            "{0}.".format(type(meas_in).__name__))
+
+
+def _key(meas, meas_mass, symmetric, density_set):
+    """Returns the key of human_key for measurements already read by
+    _read_meas_in."""
+    if meas_mass is None or meas_mass <= 0:
+        # The human is not scaled by its mass.
+        meas_mass = 0.0
+    digest = hashlib.sha256()
+    digest.update(repr(sorted((str(key), repr(float(val)))
+                              for key, val in meas.items())).encode())
+    digest.update(b'\0')
+    digest.update(repr((float(meas_mass), bool(symmetric),
+                        density_set)).encode())
+    return digest.hexdigest()
+
+
+class HumanCache(object):
+    """A size-bounded cache of humans in their default configuration, from
+    which the least recently used human is evicted. The cache can be shared
+    by threads.
+
+    """
+    def __init__(self, maxsize=32):
+        """
+        Parameters
+        ----------
+        maxsize : int, optional
+            Maximum number of humans kept.
+
+        """
+        if maxsize < 1:
+            raise ValueError("The maxsize must be at least 1.")
+        self.maxsize = maxsize
+        self._humans = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, meas_in, CFG=None, symmetric=True, density_set='Dempster',
+            copy_human=True):
+        """Returns the human given by the arguments, which are those of
+        yeadon.Human, building it only if it is not in the cache.
+
+        Parameters
+        ----------
+        meas_in, CFG, symmetric, density_set
+            See yeadon.Human.
+        copy_human : bool, optional
+            If True (default), returns a copy of the cached human, which can
+            be changed freely. If False, returns the cached human itself,
+            which must then not be changed; CFG must not be given. The
+            cached human is built from measurements in meters, so its
+            measurementconversionfactor is 1.
+
+        Returns
+        -------
+        human : yeadon.Human
+
+        """
+        if not copy_human and CFG is not None:
+            raise ValueError("A CFG cannot be given without copying the "
+                    "human.")
+        meas, meas_mass, measurementconversionfactor = \
+                _read_meas_in(meas_in)
+        key = _key(meas, meas_mass, symmetric, density_set)
+        with self._lock:
+            human = self._humans.get(key)
+            if human is not None:
+                self._humans.move_to_end(key)
+                self._hits += 1
+            else:
+                self._misses += 1
+        if human is None:
+            # The human is built outside of the lock so that other threads
+            # are not held up, from the measurements read for the key, so
+            # that a file is not read again. The measurements dict is
+            # copied, since the human keeps it and averages its limbs in
+            # place.
+            human = Human(dict(meas), symmetric=symmetric,
+                          density_set=density_set)
+            if meas_mass is not None and meas_mass > 0:
+                # As yeadon.Human does for a file with a totalmass.
+                human.meas_mass = meas_mass
+                human.scale_human_by_mass(meas_mass)
+            with self._lock:
+                self._humans[key] = human
+                self._humans.move_to_end(key)
+                while len(self._humans) > self.maxsize:
+                    self._humans.popitem(last=False)
+                    self._evictions += 1
+        if not copy_human:
+            return human
+        human = copy.deepcopy(human)
+        # The cached human may have been built for another input; the
+        # measurementconversionfactor is that of this one.
+        human.measurementconversionfactor = measurementconversionfactor
+        if type(CFG) == dict:
+            human.set_CFG_dict(CFG)
+        elif type(CFG) == str:
+            human.set_CFG_dict(Human.read_CFG(CFG))
+        return human
+
+    def info(self):
+        """Returns the statistics of the cache.
+
+        Returns
+        -------
+        info : CacheInfo
+            Number of hits, misses and evictions, the maxsize, and the
+            number of humans in the cache.
+
+        """
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._evictions,
+                             self.maxsize, len(self._humans))
+
+    def clear(self):
+        """Removes all humans from the cache, and resets its statistics."""
+        with self._lock:
+            self._humans.clear()
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+
+_cache = HumanCache()
+
+
+def cached_human(meas_in, CFG=None, symmetric=True, density_set='Dempster',
+                 copy_human=True):
+    """Returns the human given by the arguments from the module-level cache;
+    see HumanCache.get.
+
+    """
+    return _cache.get(meas_in, CFG=CFG, symmetric=symmetric,
+                      density_set=density_set, copy_human=copy_human)
+
+
+def cache_info():
+    """Returns the statistics of the module-level cache; see
+    HumanCache.info."""
+    return _cache.info()
+
+
+def cache_clear():
+    """Empties the module-level cache; see HumanCache.clear."""
+    _cache.clear()
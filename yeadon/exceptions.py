@@ -2,6 +2,10 @@
 
 
 class YeadonDeprecationWarning(DeprecationWarning):
-    """Simple wrapper so that our deprecation warnings are shown to the
-    user. By default, DeprecationWarning's are not printed."""
+    """Simple wrapper to identify our deprecation warnings. They are issued
+    with the caller's stack level, so Python shows them by default when
+    the deprecated use is in the user's script (__main__). To see them
+    elsewhere, use e.g. warnings.simplefilter('always',
+    YeadonDeprecationWarning); yeadon does not change the warning filters
+    itself."""
     pass
@@ -38,6 +38,10 @@ class YeadonGUI(HasTraits):
 
     reset_configuration = Button()
 
+    # True while the configuration is being reset, during which the drawing
+    # is not updated for each configuration variable.
+    _resetting = Bool(False)
+
     # Display of Human object properties.
     Ixx = Property(Float, depends_on=sliders)
     Ixy = Property(Float, depends_on=sliders)
@@ -250,7 +254,7 @@ class YeadonGUI(HasTraits):
             self.H._ellipsoid_mesh.remove()
 
     def _maybe_update_inertia_ellipsoid(self):
-        if self.show_inertia_ellipsoid:
+        if self.show_inertia_ellipsoid and not self._resetting:
             self.H._update_mayavi_inertia_ellipsoid()
 
     @on_trait_change('show_mass_center')
@@ -261,15 +265,27 @@ class YeadonGUI(HasTraits):
             self.H._mass_center_sphere.remove()
 
     def _maybe_update_mass_center(self):
-        if self.show_mass_center:
+        if self.show_mass_center and not self._resetting:
             self.H._update_mayavi_mass_center_sphere()
 
     @on_trait_change('reset_configuration')
     def _update_reset_configuration(self):
-        # TODO: This is really slow because it sets every trait one by one. It
-        # would be nice to set them all to zero and only call the redraw once.
-        for cfg in sliders:
-            setattr(self, cfg, self.trait(cfg).default_value()[1])
+        # Set every trait, but update the human and redraw only once.
+        self._resetting = True
+        try:
+            with self.H.deferred_update():
+                for cfg in sliders:
+                    setattr(self, cfg, self.trait(cfg).default_value()[1])
+        finally:
+            self._resetting = False
+        self._update_mayavi(['P', 'T', 'C', 'A1', 'A2', 'B1', 'B2', 'J1', 'J2',
+            'K1', 'K2'])
+        self._maybe_update_mass_center()
+        self._maybe_update_inertia_ellipsoid()
+        # The displayed properties were read before the human was updated.
+        for name in ['Ixx', 'Ixy', 'Ixz', 'Iyx', 'Iyy', 'Iyz', 'Izx', 'Izy',
+                'Izz', 'x', 'y', 'z']:
+            self.trait_property_changed(name, None, getattr(self, name))
 
     @on_trait_change('somersault')
     def _update_somersault(self):
@@ -424,14 +440,19 @@ class YeadonGUI(HasTraits):
 
     def _update_mayavi(self, segments):
         """Updates all of the segments and solids."""
-        for affected in segments:
-            seg = self.H.get_segment_by_name(affected)
+        if self._resetting:
+            return
+        segments = [self.H.get_segment_by_name(affected)
+                    for affected in segments]
+        for seg in segments:
             for solid in seg.solids:
                 solid._mesh.scene.disable_render = True
-        for affected in segments:
-            self.H.get_segment_by_name(affected)._update_mayavi()
-        for affected in segments:
-            seg = self.H.get_segment_by_name(affected)
+        # All vertices are moved at once, and the solids are given views
+        # onto them.
+        mesh = self.H._update_body_mesh()
+        for seg in segments:
+            seg._update_mayavi(mesh)
+        for seg in segments:
             for solid in seg.solids:
                 solid._mesh.scene.disable_render = False
 
@@ -4,46 +4,44 @@ import numpy as np
 
 from .exceptions import YeadonDeprecationWarning
 
-# Display our warnings to the user.
-warnings.simplefilter('always', YeadonDeprecationWarning)
-
 
 def parallel_axis(Ic, m, d):
     '''Returns the moment of inertia of a body about a different point.
 
     Parameters
     ----------
-    Ic : array_like, shape(3,3)
+    Ic : array_like, shape(3,3) or shape(..., 3, 3)
         The moment of inertia about the center of mass of the body with
         respect to an orthogonal coordinate system.
-    m : float
+    m : float or array_like, shape(...)
         The mass of the body.
-    d : array_like, shape(3,) or shape(3, 1) or shape(1, 3)
+    d : array_like, shape(3,) or shape(3, 1) or shape(1, 3) or shape(..., 3)
         The distances along the x, y, and z axes that locate the new point
         relative to the center of mass of the body.
 
     Returns
     -------
-    I : ndarray, shape(3,3)
+    I : ndarray, shape(3,3) or shape(..., 3, 3)
         The moment of inertia of a body about a point located by the
-        distances in `d`.
+        distances in `d`. Stacks of inertias, masses and distances are
+        broadcast against each other.
 
     '''
 
     Ic = np.asarray(Ic)
-    d = np.asarray(d).reshape((3, 1))
-
-    a = d[0, 0]
-    b = d[1, 0]
-    c = d[2, 0]
+    m = np.asarray(m)
+    d = np.asarray(d)
+    if d.shape == (3, 1) or (d.shape == (1, 3) and Ic.ndim == 2 and
+                             m.ndim == 0):
+        d = d.reshape(3)
 
-    dMat = np.zeros((3, 3), dtype=Ic.dtype)
+    a, b, c = _unstack(d)
 
-    dMat[0] = np.array([b ** 2 + c ** 2, -a * b, -a * c])
-    dMat[1] = np.array([-a * b, c ** 2 + a ** 2, -b * c])
-    dMat[2] = np.array([-a * c, -b * c, a ** 2 + b ** 2])
+    dMat = _matrix([[b ** 2 + c ** 2, -a * b, -a * c],
+                    [-a * b, c ** 2 + a ** 2, -b * c],
+                    [-a * c, -b * c, a ** 2 + b ** 2]], d)
 
-    return Ic + m * dMat
+    return Ic + m[..., np.newaxis, np.newaxis] * dMat
 
 
 def rotate_space_123(angles):
@@ -53,17 +51,18 @@ def rotate_space_123(angles):
 
     Parameters
     ----------
-    angles : numpy.array or list or tuple, shape(3,)
+    angles : numpy.array or list or tuple, shape(3,) or shape(..., 3)
         Three angles (in units of radians) that specify the orientation of
         a new reference frame with respect to a fixed reference frame.
         The first angle is a pure rotation about the x-axis, the second about
         the y-axis, and the third about the z-axis. All rotations are with
         respect to the initial fixed frame, and they occur in the order x,
-        then y, then z.
+        then y, then z. A stack of angles, e.g. of shape (N, 3), gives a
+        stack of matrices.
 
     Returns
     -------
-    R : ndarray, shape(3,3)
+    R : ndarray, shape(3,3) or shape(..., 3, 3)
         Three dimensional rotation matrix about three different orthogonal axes.
 
     Notes
@@ -89,28 +88,13 @@ def rotate_space_123(angles):
     va = R * vb
 
     """
-    cx = np.cos(angles[0])
-    sx = np.sin(angles[0])
-
-    cy = np.cos(angles[1])
-    sy = np.sin(angles[1])
-
-    cz = np.cos(angles[2])
-    sz = np.sin(angles[2])
+    angles, (cx, cy, cz), (sx, sy, sz) = _cos_sin(angles)
 
-    Rz = np.array([[ cz,-sz,  0],
-                   [ sz, cz,  0],
-                   [  0,  0,  1]])
+    # The entries of Rz * Ry * Rx.
+    return _matrix([[cz * cy, -sz * cx + cz * sy * sx, sz * sx + cz * sy * cx],
+                    [sz * cy, cz * cx + sz * sy * sx, -cz * sx + sz * sy * cx],
+                    [-sy, cy * sx, cy * cx]], angles)
 
-    Ry = np.array([[ cy,  0, sy],
-                   [  0,  1,  0],
-                   [-sy,  0, cy]])
-
-    Rx = np.array([[  1,  0,  0],
-                   [  0, cx, -sx],
-                   [  0, sx,  cx]])
-
-    return Rz @ Ry @ Rx
 
 def euler_123(angles):
     """
@@ -119,7 +103,7 @@ def euler_123(angles):
 
     Parameters
     ----------
-    angles : array_like, shape(3,)
+    angles : array_like, shape(3,) or shape(..., 3)
         Three angles (in units of radians) that specify the orientation of a
         new reference frame, B, with respect to a fixed reference frame, A. The
         first angle, phi, is a rotation about the fixed frame's x-axis. The
@@ -129,11 +113,12 @@ def euler_123(angles):
         Thus, all three angles are "relative" rotations with respect to each
         new frame.  Note: if the rotations are viewed as occuring in the
         opposite direction (z, then y, then x), all three rotations are with
-        respect to the initial fixed frame rather than "relative".
+        respect to the initial fixed frame rather than "relative". A stack of
+        angles, e.g. of shape (N, 3), gives a stack of matrices.
 
     Returns
     -------
-    R : ndarray, shape(3,3)
+    R : ndarray, shape(3,3) or shape(..., 3, 3)
         Three dimensional rotation matrix about three different orthogonal axes.
 
     Notes
@@ -164,29 +149,38 @@ def euler_123(angles):
     v_b is the same vector expressed in the rotated reference frame.
 
     """
+    angles, (c1, c2, c3), (s1, s2, s3) = _cos_sin(angles)
 
-    cphi = np.cos(angles[0])
-    sphi = np.sin(angles[0])
+    return _matrix([[c2 * c3, -c2 * s3, s2],
+                    [s1 * s2 * c3 + s3 * c1, -s1 * s2 * s3 + c3 * c1, -s1 * c2],
+                    [-c1 * s2 * c3 + s3 * s1, c1 * s2 * s3 + c3 * s1, c1 * c2]],
+                   angles)
 
-    cthe = np.cos(angles[1])
-    sthe = np.sin(angles[1])
 
-    cpsi = np.cos(angles[2])
-    spsi = np.sin(angles[2])
+def _cos_sin(angles):
+    """Returns the angles as an array, and the cosines and the sines of the
+    three angles, for the rotation matrix kernels (see _unstack)."""
+    angles = np.asarray(angles)
+    return angles, _unstack(np.cos(angles)), _unstack(np.sin(angles))
 
-    R1 = np.array([[     1,     0,     0],
-                   [     0,  cphi, -sphi],
-                   [     0,  sphi,  cphi]])
 
-    R2 = np.array([[  cthe,     0,  sthe],
-                   [     0,     1,     0],
-                   [ -sthe,     0,  cthe]])
+def _unstack(vectors):
+    """Returns the three components of a vector, or of a (..., 3) stack of
+    vectors. The components of a single vector are Python scalars, which are
+    much faster to combine than numpy scalars."""
+    if vectors.ndim == 1:
+        return vectors.tolist()
+    return np.moveaxis(vectors, -1, 0)
 
-    R3 = np.array([[  cpsi,  -spsi,     0],
-                   [  spsi,  cpsi,     0],
-                   [     0,     0,     1]])
 
-    return R1 @ R2 @ R3
+def _matrix(rows, vectors):
+    """Returns the (3, 3) matrix, or the (..., 3, 3) stack of matrices,
+    whose entries are given by the nested lists `rows`, which were computed
+    from the components of `vectors` (see _unstack)."""
+    if vectors.ndim == 1:
+        return np.array(rows)
+    return np.stack([np.stack(np.broadcast_arrays(*row), axis=-1)
+                     for row in rows], axis=-2)
 
 
 def rotate3_inertia(rotation_matrix, inertia):
@@ -197,7 +191,7 @@ def rotate3_inertia(rotation_matrix, inertia):
 
     msg = ("rotate3_inertia has been renamed to rotate_inertia, this " +
            "function signature will be removed in Yeadon 2.0.")
-    warnings.warn(msg, YeadonDeprecationWarning)
+    warnings.warn(msg, YeadonDeprecationWarning, stacklevel=2)
 
     return rotate_inertia(rotation_matrix, inertia)
 
@@ -209,18 +203,19 @@ def rotate_inertia(rotation_matrix, inertia):
 
     Parameters
     ----------
-    rotation_matrix : array_like, shape(3,3)
+    rotation_matrix : array_like, shape(3,3) or shape(..., 3, 3)
         Three-dimensional rotation/transformation/direction-cosine matrix
         that transforms a vector in the rotated reference frame into one in
         the current reference frame.
-    inertia : array_like, shape(3,3)
+    inertia : array_like, shape(3,3) or shape(..., 3, 3)
         Three-dimensional cartesian tensor describing the inertia of a rigid
         body in a reference frame.
 
     Returns
     -------
-    rotated_inertia : ndarray, shape(3,3)
-        The inertia tensor expressed in the rotated reference frame.
+    rotated_inertia : ndarray, shape(3,3) or shape(..., 3, 3)
+        The inertia tensor expressed in the rotated reference frame. Stacks
+        of rotation matrices and inertias are broadcast against each other.
 
     Notes
     -----
@@ -253,7 +248,8 @@ def rotate_inertia(rotation_matrix, inertia):
     I_b = R^T * I_a * R
 
     """
-    return rotation_matrix.T @ inertia @ rotation_matrix
+    rotation_matrix = np.asarray(rotation_matrix)
+    return np.swapaxes(rotation_matrix, -1, -2) @ inertia @ rotation_matrix
 
 
 def total_com(coordinates, masses):
@@ -303,3 +299,71 @@ def principal_axes(I):
     Ip = Ip[indices]
     C = C.T[indices]
     return Ip, C
+
+
+def principal_axes_batch(I, continuous=False):
+    """Returns the principal moments of inertia and the orientation of each
+    of a stack of inertia tensors, using the symmetric eigensolver.
+
+    Parameters
+    ----------
+    I : ndarray, shape(..., 3, 3)
+        Symmetric inertia tensors. If `continuous`, the first dimension is a
+        sequence of frames, e.g. of a motion.
+    continuous : bool, optional
+        If False (the default), the principal moments of each tensor are
+        sorted from smallest to largest, as principal_axes does. If True,
+        the moments and axes of each frame are instead ordered, and the axes
+        signed, so as to best match those of the previous frame; the first
+        frame is sorted. This keeps the principal axes of a smoothly varying
+        tensor from swapping or flipping, e.g. when two moments cross.
+        A single tensor of shape (3, 3) is not a sequence of frames, and
+        raises a ValueError.
+
+    Returns
+    -------
+    Ip : ndarray, shape(..., 3)
+        The principal moments of inertia.
+    C : ndarray, shape(..., 3, 3)
+        The rotation matrices, whose rows are the principal axes (as in
+        principal_axes). The sign of an axis is chosen so that each rotation
+        matrix is proper (has determinant 1); if `continuous`, this is true
+        of the first frame, and of the following frames as long as they are
+        continuous.
+
+    """
+    I = np.asarray(I)
+    if continuous and I.ndim < 3:
+        raise ValueError("With continuous=True, I must have shape (N, ..., "
+                         "3, 3), not {0}.".format(I.shape))
+    Ip, C = np.linalg.eigh(I)
+    C = np.swapaxes(C, -1, -2)
+    # Flip the third axis of improper rotation matrices.
+    C[..., 2, :] *= np.sign(np.linalg.det(C))[..., np.newaxis]
+    if not continuous or I.shape[0] < 2:
+        return Ip, C
+
+    # The signed permutation (a matrix S_t whose rows hold a single +1 or
+    # -1) that best maps the axes of each frame onto those of the previous
+    # frame: the one that maximizes the overlap of matched axes.
+    overlaps = C[:-1] @ np.swapaxes(C[1:], -1, -2)
+    permutations = np.array([[0, 1, 2], [0, 2, 1], [1, 0, 2],
+                             [1, 2, 0], [2, 0, 1], [2, 1, 0]])
+    matched = overlaps[..., np.arange(3), permutations]
+    best = permutations[np.argmax(np.sum(np.abs(matched), axis=-1),
+                                 axis=-1)]
+    signs = np.where(np.take_along_axis(overlaps, best[..., np.newaxis],
+                                        axis=-1)[..., 0] < 0, -1.0, 1.0)
+    steps = np.zeros(I.shape, dtype=float)
+    steps[0] = np.eye(3)
+    np.put_along_axis(steps[1:], best[..., np.newaxis],
+                      signs[..., np.newaxis], axis=-1)
+    # The axes of frame t are Q_t C_t, in which Q_t = S_1 S_2 ... S_t. The
+    # products are accumulated with a parallel prefix scan, in log2(N)
+    # vectorized steps.
+    Q = steps
+    shift = 1
+    while shift < Q.shape[0]:
+        Q[shift:] = Q[:-shift] @ Q[shift:]
+        shift *= 2
+    return (np.abs(Q) @ Ip[..., np.newaxis])[..., 0], Q @ C
@@ -0,0 +1,354 @@
+"""The population module defines the Population class, which calculates the
+inertial properties of many humans at once from a matrix of measurements.
+The solids, segments and whole bodies of all humans are computed in a single
+vectorized pass, without creating yeadon.Solid, yeadon.Segment or
+yeadon.Human objects. The results are those that yeadon.Human gives for each
+set of measurements.
+
+"""
+
+import numpy as np
+
+from . import body
+from . import solid as sol
+from .human import Human
+
+def measurement_jacobian(measurements, masses=None, CFG=None,
+                         symmetric=True, density_set='Dempster', step=1e-20,
+                         pos=None, rot_mat=None, densities=None):
+    """Returns the mass, center of mass, and inertia of each human, and their
+    derivatives with respect to each of the 95 measurements, by complex-step
+    differentiation: each measurement is perturbed by an imaginary step in
+    its own copy of the measurements, and all copies of all humans are
+    evaluated in a single Population. The derivatives are exact to machine
+    precision, and include the effect of the quantities derived from the
+    measurements (e.g., the Ls5 stadium, from Ls4) and of the averaging of
+    the limbs.
+
+    Parameters
+    ----------
+    measurements, masses, CFG, symmetric, density_set, densities
+        See Population. If masses are given, the mass of each human is held
+        fixed, so its derivatives are zero. Otherwise, the densities of the
+        solids are held fixed.
+    step : float, optional
+        The imaginary step. As no difference is taken, it can be much smaller
+        than the measurements without loss of precision.
+    pos : array_like, shape(3,), optional
+        Position of the bottom center of the pelvis (Ls0) in the global
+        frame; see Human._coord_sys_pos. By default, the origin.
+    rot_mat : array_like, shape(3, 3), optional
+        Orientation of the pelvis in the default configuration; see
+        Human._coord_sys_orient. By default, the identity.
+
+    Returns
+    -------
+    mass : np.array (M,)
+    center_of_mass : np.array (M, 3)
+    inertia : np.array (M, 3, 3)
+        See Population.
+    mass_jacobian : np.array (M, 95)
+        Derivative of the mass of each human with respect to each
+        measurement (ordered like Human.measnames), in units of kg/m.
+    center_of_mass_jacobian : np.array (M, 3, 95)
+        Derivative of the center of mass, unitless.
+    inertia_jacobian : np.array (M, 3, 3, 95)
+        Derivative of the inertia tensor, in units of kg-m.
+
+    """
+    measurements = np.asarray(measurements, dtype=float)
+    if (measurements.ndim != 2 or
+            measurements.shape[1] != len(Human.measnames)):
+        raise ValueError("measurements must have shape (M, {0}), but has "
+                "shape {1}.".format(len(Human.measnames),
+                                    measurements.shape))
+    num_humans, num_meas = measurements.shape
+    # Row j of the copies of a human has measurement j perturbed.
+    perturbed = (measurements[:, np.newaxis, :] +
+                 1j * step * np.eye(num_meas)).reshape(-1, num_meas)
+    if masses is not None:
+        masses = np.repeat(np.broadcast_to(masses, (num_humans,)), num_meas)
+    if CFG is not None:
+        CFG = np.asarray(CFG)
+        if CFG.ndim == 2:
+            CFG = np.repeat(CFG, num_meas, axis=0)
+    if densities is not None:
+        densities = np.asarray(densities)
+        if densities.ndim == 2:
+            densities = np.repeat(densities, num_meas, axis=0)
+    population = Population(perturbed, masses=masses, CFG=CFG,
+                            symmetric=symmetric, density_set=density_set,
+                            densities=densities)
+    if pos is not None or rot_mat is not None:
+        population._calc_properties(
+                np.zeros(3) if pos is None else np.reshape(pos, 3),
+                np.eye(3) if rot_mat is None else np.asarray(rot_mat))
+
+    def split(values):
+        """Returns the values of each human, and their derivatives, with the
+        measurement as the last dimension."""
+        values = values.reshape((num_humans, num_meas) + values.shape[1:])
+        return (values[:, 0].real,
+                np.moveaxis(values.imag / step, 1, -1))
+    mass, mass_jacobian = split(population.mass)
+    center_of_mass, center_of_mass_jacobian = split(
+            population.center_of_mass)
+    inertia, inertia_jacobian = split(population.inertia)
+    return (mass, center_of_mass, inertia, mass_jacobian,
+            center_of_mass_jacobian, inertia_jacobian)
+
+
+class Population(object):
+    """The inertial properties of many humans, each in the same or in its own
+    configuration.
+
+    """
+    @property
+    def mass(self):
+        """Mass of each human, a np.array of shape (M,), in units of kg."""
+        return self._mass
+
+    @property
+    def center_of_mass(self):
+        """Center of mass of each human, a np.array of shape (M, 3), in units
+        of m, expressed in the global frame, from the bottom center of the
+        pelvis (Ls0)."""
+        return self._center_of_mass
+
+    @property
+    def inertia(self):
+        """Inertia tensor of each human, a np.array of shape (M, 3, 3), in
+        units of kg-m^2, about the center of mass of the human, expressed in
+        the global frame."""
+        return self._inertia
+
+    @property
+    def segment_mass(self):
+        """Mass of each segment of each human, a np.array of shape (M, 11),
+        in units of kg. The segments are in the order of segment_names."""
+        return self._body_arrays.segment_mass
+
+    @property
+    def segment_center_of_mass(self):
+        """Center of mass of each segment of each human, a np.array of shape
+        (M, 11, 3), in units of m, expressed in the global frame, from the
+        bottom center of the pelvis (Ls0)."""
+        return self._body_arrays.segment_center_of_mass
+
+    @property
+    def segment_inertia(self):
+        """Inertia tensor of each segment of each human, a np.array of shape
+        (M, 11, 3, 3), in units of kg-m^2, about the center of mass of the
+        segment, expressed in the global frame."""
+        return self._body_arrays.segment_inertia
+
+    @property
+    def segment_names(self):
+        """Names of the segments, e.g. 'A1', in the order of the segment
+        arrays."""
+        return self._body_arrays.segment_names
+
+    def __init__(self, measurements, masses=None, CFG=None, symmetric=True,
+                 density_set='Dempster', densities=None):
+        """Calculates the inertial properties of the humans.
+
+        Parameters
+        ----------
+        measurements : array_like, shape(M, 95)
+            The 95 measurements (in meters) of each of M humans, one human
+            per row, with the columns ordered like Human.measnames. Complex
+            measurements are supported, for complex-step differentiation.
+        masses : array_like, shape(M,), optional
+            Measured mass of each human, in kilograms. If given, the densities
+            of each human are scaled so that its mass is the measured mass,
+            as Human.scale_human_by_mass does.
+        CFG : array_like, shape(21,) or shape(M, 21), optional
+            The configuration of all humans, or of each human (radians),
+            ordered like Human.CFGnames. By default all joint angles are
+            zero. The angles are not validated against Human.CFGbounds.
+        symmetric : bool, optional
+            True by default. Decides whether or not to average the
+            measurements of the left and right limbs of each human.
+        density_set : str, optional
+            Selects a set of densities to use for the body segments. Either
+            'Chandler', 'Clauser', or 'Dempster'. 'Dempster' is the default.
+        densities : array_like, shape(40,) or shape(M, 40), optional
+            The density of each solid of all humans, or of each human
+            (kg/m^3), ordered like Human.objnames, as given to
+            Human.set_densities. If given, these are used instead of the
+            densities of density_set, and they are scaled if masses are
+            given.
+
+        """
+        if density_set not in ['Chandler', 'Clauser', 'Dempster']:
+            raise Exception("Density set {0!r} is not one of 'Chandler', "
+                    "'Clauser', or 'Dempster'.".format(density_set))
+        self._density_set = density_set
+        self.is_symmetric = symmetric
+
+        measurements = np.array(measurements)
+        if (measurements.ndim != 2 or
+                measurements.shape[1] != len(Human.measnames)):
+            raise ValueError("measurements must have shape (M, {0}), but has "
+                    "shape {1}.".format(len(Human.measnames),
+                                        measurements.shape))
+        if measurements.dtype.kind not in 'fc':
+            measurements = measurements.astype(float)
+        for name, column in zip(Human.measnames, measurements.T):
+            if np.any(np.real(column) <= 0):
+                raise ValueError("Variable {0} has inappropriate "
+                        "value.".format(name))
+        if self.is_symmetric:
+            # Same indices as in Human._average_limbs.
+            leftidxs = np.hstack((np.arange(21, 39), np.arange(57, 76)))
+            rightidx = np.hstack((np.arange(39, 57), np.arange(76, 95)))
+            avg = 0.5 * (measurements[:, leftidxs] +
+                         measurements[:, rightidx])
+            measurements[:, leftidxs] = avg
+            measurements[:, rightidx] = avg
+        self.measurements = measurements
+        num_humans = measurements.shape[0]
+
+        solids = self._solid_arrays(dict(zip(Human.measnames,
+                                             measurements.T)))
+        density = solids['density']
+        if densities is not None:
+            densities = np.asarray(densities, dtype=float)
+            if densities.shape[-1] != density.shape[-1]:
+                raise ValueError("densities must have shape ({0},) or (M, "
+                        "{0}), but has shape {1}.".format(density.shape[-1],
+                                                          densities.shape))
+            density = np.broadcast_to(densities, density.shape).copy()
+        self._body_arrays = self._make_body_arrays(solids, density)
+        if masses is not None:
+            masses = np.broadcast_to(masses, (num_humans,))
+            segment_mass = self._body_arrays.segment_mass
+            # Summed in the same order as in Human.calc_properties.
+            mass = sum(segment_mass[:, i]
+                       for i in range(segment_mass.shape[1]))
+            self._body_arrays.scale_density(masses / mass)
+
+        if CFG is None:
+            CFG = np.zeros(len(Human.CFGnames))
+        CFG = np.asarray(CFG)
+        if CFG.shape[-1] != len(Human.CFGnames):
+            raise ValueError("CFG must have shape ({0},) or (M, {0}), but has "
+                    "shape {1}.".format(len(Human.CFGnames), CFG.shape))
+        self._CFGs = np.broadcast_to(CFG, (num_humans, len(Human.CFGnames)))
+        self._offsets = Human._offsets_of_solids(
+                list(np.moveaxis(solids['height'], -1, 0)),
+                solids['stadia']['Ls0'], solids['stadia']['Ls4'])
+        self._calc_properties(np.zeros(3), np.eye(3))
+
+    def _calc_properties(self, pos, rot_mat):
+        """Calculates the global properties of the segments and of the humans
+        in the given coordinate system (see Human._coord_sys_pos and
+        Human._coord_sys_orient).
+
+        Parameters
+        ----------
+        pos : np.array (3,)
+            Position of the bottom center of the pelvis (Ls0).
+        rot_mat : np.array (3, 3)
+            Orientation of the pelvis in the default configuration.
+
+        """
+        positions, rot_mats = Human._segment_poses(self._CFGs, self._offsets,
+                                                   pos, rot_mat)
+        arrays = self._body_arrays
+        arrays.calc_segment_properties(positions, rot_mats)
+        self._mass, self._center_of_mass, self._inertia = \
+                body.combine_properties(arrays.segment_mass,
+                                        arrays.segment_center_of_mass,
+                                        arrays.segment_inertia)
+
+    def _make_body_arrays(self, solids, density):
+        """Returns the BodyArrays of the solids with the given densities.
+
+        Parameters
+        ----------
+        solids : dict
+            See Population._solid_arrays.
+        density : np.array (M, 40)
+
+        """
+        is_stadium = solids['is_stadium']
+        stadium_mass, stadium_zcom, stadium_moments = \
+                sol.stadium_solid_properties(solids['r0'], solids['t0'],
+                        solids['r1'], solids['t1'], solids['height'], density,
+                        solids['alignment'])
+        # The radius of the semiellipsoid is stored in r0.
+        ellipsoid_mass, ellipsoid_zcom, ellipsoid_moments = \
+                sol.semiellipsoid_properties(solids['r0'], solids['height'],
+                                             density)
+        mass = np.where(is_stadium, stadium_mass, ellipsoid_mass)
+        zcom = np.where(is_stadium, stadium_zcom, ellipsoid_zcom)
+        moments = np.where(is_stadium[:, np.newaxis], stadium_moments,
+                           ellipsoid_moments)
+        rel_center_of_mass = np.zeros(zcom.shape + (3,), dtype=zcom.dtype)
+        rel_center_of_mass[..., 2] = zcom
+        rel_inertia = np.zeros(moments.shape + (3,), dtype=moments.dtype)
+        for i in range(3):
+            rel_inertia[..., i, i] = moments[..., i]
+        segments = Human._segment_table
+        return body.BodyArrays(
+                [name for name, label, num_solids, color, build in segments],
+                [build for name, label, num_solids, color, build in segments],
+                Human.objnames[:len(Human._solid_table)],
+                np.repeat(np.arange(len(segments)),
+                          [num_solids for name, label, num_solids, color,
+                           build in segments]),
+                density, solids['height'], mass, rel_center_of_mass,
+                rel_inertia)
+
+    def _solid_arrays(self, meas):
+        """Returns the dimensions of the 40 solids of each human, defined
+        from the measurements by the same tables as in Human._define_solids.
+
+        Parameters
+        ----------
+        meas : dict
+            Maps the names in Human.measnames to np.array's of shape (M,).
+
+        Returns
+        -------
+        solids : dict
+            'r0', 't0', 'r1', 't1' (radii and thicknesses of the stadium0
+            and stadium1 of each solid), 'height', 'density' (np.array's of
+            shape (M, 40)), 'alignment' (np.array of str of shape (40,)),
+            'is_stadium' (np.array of bool of shape (40,)), and 'stadia' (see
+            Human._define_stadia).
+
+        """
+        densities = Human.segmental_densities[self._density_set]
+        stadia = Human._define_stadia(meas)
+        num_humans = len(meas['Ls1L'])
+        rows = Human._solid_table
+        # The semiellipsoid has only a base stadium, whose radius is its own.
+        is_stadium = np.array([stadium1 is not None for label, density_name,
+                               stadium0, stadium1, top, base in rows])
+        stadia0 = [stadia[row[2]] for row in rows]
+        stadia1 = [stadia[row[2] if row[3] is None else row[3]]
+                   for row in rows]
+        stack = lambda values: np.stack(np.broadcast_arrays(*values),
+                                        axis=-1)
+        solids = {
+            'r0': stack([stadium.radius for stadium in stadia0]),
+            't0': stack([stadium.thickness for stadium in stadia0]),
+            'r1': stack([stadium.radius for stadium in stadia1]),
+            't1': stack([stadium.thickness for stadium in stadia1]),
+            'height': stack(Human._solid_heights(meas)),
+            'density': stack([np.full(num_humans, float(densities[row[1]]))
+                              for row in rows]),
+            'alignment': np.array(['AP' if 'AP' in (stadium0.alignment,
+                                                    stadium1.alignment)
+                                   else 'ML' for stadium0, stadium1 in
+                                   zip(stadia0, stadia1)]),
+            'is_stadium': is_stadium,
+            'stadia': stadia,
+            }
+        # The thicknesses of the semiellipsoid must not make the stadium
+        # kernel divide by zero.
+        solids['t0'][..., ~is_stadium] = 1.0
+        solids['t1'][..., ~is_stadium] = 1.0
+        return solids
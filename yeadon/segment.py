@@ -17,6 +17,8 @@ class Segment(object):
     @property
     def mass(self):
         """Mass of the segment, in units of kg."""
+        if self._arrays is not None:
+            return self._arrays.segment_mass[self._index]
         return self._mass
 
     @property
@@ -24,6 +26,9 @@ class Segment(object):
         """Center of mass of the segment, a np.ndarray, in units of m,
         expressed in the global frame, from the bottom center of the pelvis
         (Ls0)."""
+        if self._arrays is not None:
+            return self._arrays.segment_center_of_mass[self._index, :,
+                                                       np.newaxis]
         return self._center_of_mass
 
     @property
@@ -31,6 +36,8 @@ class Segment(object):
         """Inertia matrix of the segment, a np.array, in units of kg-m^2,
         about the center of mass of the human, expressed in the global
         frame."""
+        if self._arrays is not None:
+            return self._arrays.segment_inertia[self._index]
         return self._inertia
 
     @property
@@ -38,6 +45,9 @@ class Segment(object):
         """Center of mass of the segment, a np.ndarray, in units of m,
         expressed in the frame of the segment, from the origin of the
         segment."""
+        if self._arrays is not None:
+            return self._arrays.segment_rel_center_of_mass[self._index, :,
+                                                           np.newaxis]
         return self._rel_center_of_mass
 
     @property
@@ -45,6 +55,8 @@ class Segment(object):
         """Inertia matrix/dyadic of the segment, a np.array, in units of
         kg-m^2, about the center of mass of the segment, expressed in the frame
         of the segment."""
+        if self._arrays is not None:
+            return self._arrays.segment_rel_inertia[self._index]
         return self._rel_inertia
 
     @property
@@ -71,7 +83,7 @@ class Segment(object):
         return self._rot_mat
 
     def __init__(self, label, pos, rot_mat, solids, color,
-                 build_toward_positive_z=True):
+                 build_toward_positive_z=True, arrays=None, index=None):
         """Initializes a segment object. Stores inputs as instance variables,
         calculates the orientation of the segment's child solids, and
         calculates the "relative" inertia parameters (mass, center of mass
@@ -102,26 +114,55 @@ class Segment(object):
             False, then they are stacked in the local -z direction. This is
             done so that, for example, in the default configuration, the arms
             are directed down.
+        arrays : yeadon.body.BodyArrays, optional
+            If given, the segment is a view onto entry `index` of the segment
+            arrays, which already hold the relative properties of the
+            segment. The global properties are then calculated by the owner
+            of the arrays (see BodyArrays.calc_segment_properties).
+        index : int, optional
+            Index of this segment in `arrays`.
 
         """
         self.label = label
-        if pos.shape != (3, 1):
-            raise ValueError("Position must be 3-D.")
-        self._pos = pos
-        self._rot_mat = np.asarray(rot_mat)
         self.solids = solids
         self.nSolids = len(self.solids)
         self.color = color
         self._build_toward_positive_z = build_toward_positive_z
+        self._arrays = arrays
+        self._index = index
         # must set the position of constituent solids before being able to
         # calculate relative/local properties, or set end_pos/length.
+        self.set_orientation(pos, rot_mat)
+        self.length = np.linalg.norm(self._end_pos - self.pos)
+        if self._arrays is None:
+            self.calc_rel_properties()
+
+    def set_orientation(self, pos, rot_mat):
+        """Sets the position and orientation of the segment and of its
+        constituent solids. The relative properties of the segment do not
+        depend on its position and orientation, and are not recalculated.
+        Call calc_properties afterwards to update the global center of mass
+        and inertia.
+
+        Parameters
+        ----------
+        pos : numpy.array, shape(3,1)
+            The vector position of the segment's base,
+            with respect to the global frame.
+        rot_mat : array_like, shape(3,3)
+            The orientation of the segment with respect to the global frame.
+            See the constructor.
+
+        """
+        if pos.shape != (3, 1):
+            raise ValueError("Position must be 3-D.")
+        self._pos = pos
+        self._rot_mat = np.asarray(rot_mat)
         self._set_orientations()
         if self._build_toward_positive_z:
             self._end_pos = self.solids[-1].end_pos
         else:
             self._end_pos = self.solids[-1].pos
-        self.length = np.linalg.norm(self._end_pos - self.pos)
-        self.calc_rel_properties()
 
     def _set_orientations(self):
         """Sets the position (self.pos) and rotation matrix (self.rot_mat)
@@ -207,9 +248,16 @@ class Segment(object):
 
         """
         # center of mass
-        self._center_of_mass = self.pos + self.rot_mat @ self.rel_center_of_mass
+        center_of_mass = self.pos + self.rot_mat @ self.rel_center_of_mass
         # inertia in frame f w.r.t. segment's COM
-        self._inertia = inertia.rotate_inertia(self.rot_mat, self.rel_inertia)
+        inertia_ = inertia.rotate_inertia(self.rot_mat, self.rel_inertia)
+        if self._arrays is not None:
+            self._arrays.segment_center_of_mass[self._index] = \
+                    center_of_mass[:, 0]
+            self._arrays.segment_inertia[self._index] = inertia_
+        else:
+            self._center_of_mass = center_of_mass
+            self._inertia = inertia_
 
     def __str__(self):
         return(self._properties_string())
@@ -309,12 +357,32 @@ Inertia tensor in global frame about segment's COM (kg-m^2):
         for s in self.solids:
             s.print_properties(precision=precision, suppress=suppress)
 
-    def draw_mayavi(self, mlabobj):
-        """Draws in a MayaVi window all the solids within this segment.  """
+    def draw_mayavi(self, mlabobj, mesh=None):
+        """Draws in a MayaVi window all the solids within this segment.
+
+        Parameters
+        ----------
+        mlabobj :
+            The MayaVi object we can draw on.
+        mesh : yeadon.body.BodyMesh, optional
+            If given, the meshes of the solids are taken from it instead of
+            being calculated solid by solid.
+
+        """
         for s in self.solids:
-            s.draw_mayavi(mlabobj, self.color)
+            s.draw_mayavi(mlabobj, self.color, self._solid_mesh_points(s,
+                                                                       mesh))
 
-    def _update_mayavi(self):
-        """Updates all of the solids in this segment for MayaVi."""
+    def _update_mayavi(self, mesh=None):
+        """Updates all of the solids in this segment for MayaVi. See
+        draw_mayavi for the parameter."""
         for s in self.solids:
-            s._update_mayavi()
+            s._update_mayavi(self._solid_mesh_points(s, mesh))
+
+    @staticmethod
+    def _solid_mesh_points(solid, mesh):
+        """Returns the mesh points of the solid from the body mesh, or None
+        if there is no body mesh."""
+        if mesh is None:
+            return None
+        return mesh.solid_mesh_points(solid._index)
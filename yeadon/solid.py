@@ -12,6 +12,16 @@ import numpy as np
 from . import inertia
 from .utils import printoptions
 
+
+def _any(condition):
+    """Returns whether any element of condition, a bool or an np.array of
+    bools, is true; for a single stadium, this avoids the overhead of
+    np.any."""
+    if isinstance(condition, np.ndarray):
+        return condition.any()
+    return condition
+
+
 class Stadium(object):
     """Stadium, the 2D shape.
 
@@ -61,6 +71,8 @@ class Stadium(object):
         'Lk7': 'arch',
         'Lk8': 'ball',
         'Lk9': 'toe nails'}
+    _valid_labels = frozenset(lab + ': ' + desc for lab, desc in
+                              validStadiaLabels.items())
 
     def __init__(self, label, inID, in1, in2=None, alignment='ML'):
         """Defines a 2D stadium shape and checks inputs for errors. A stadium,
@@ -85,11 +97,17 @@ class Stadium(object):
             medio-lateral. Aleternatively, 'AP' (anteroposterior) can be
             supplied. The only 'AP' stadiums should be at the heels.
 
+        Notes
+        -----
+        in1 and in2 can also be np.array's, to define the same stadium level
+        of many humans at once (see yeadon.Population); the dimensions of the
+        stadium are then arrays too. They can be complex, for complex-step
+        differentiation, in which case only their real parts are checked.
+
         """
         if label == 'Ls5: acromion/bottom of neck':
             self.label = label
-        elif label in [lab + ': ' + desc for lab, desc in
-                self.validStadiaLabels.items()]:
+        elif label in self._valid_labels:
             self.label = label
         else:
             raise ValueError("'{}' is not a valid label.".format(label))
@@ -121,19 +139,28 @@ class Stadium(object):
             raise ValueError("Stadium " + self.label +
                 " not defined properly, " + inID + " is not valid. You must " +
                 "use inID= perimwidth, depthwidth, perimeter, or radius.")
-        if self.radius == 0:
-            raise ValueError("Radius of stadium '%' is zero." % self.radius)
-        if self.radius < 0 or self.thickness < 0:
-            warnings.warn("Stadium '{}' is defined "
-                "incorrectly, r must be positive and t must be nonnegative. "
-                "r = {} and t = {} . This means that 2 < perimeter/width < pi. "
-                "Currently, this ratio is {}.\n".format(self.label,
-                    self.radius, self.thickness, self.perimeter / self.width))
+        if _any(self.radius == 0):
+            raise ValueError("Radius of stadium '{}' is zero.".format(
+                self.label))
+        invalid = (np.real(self.radius) < 0) | (np.real(self.thickness) < 0)
+        if _any(invalid):
+            if np.ndim(invalid) == 0:
+                warnings.warn("Stadium '{}' is defined "
+                    "incorrectly, r must be positive and t must be "
+                    "nonnegative. r = {} and t = {} . This means that 2 < "
+                    "perimeter/width < pi. Currently, this ratio is "
+                    "{}.\n".format(self.label, self.radius, self.thickness,
+                                   self.perimeter / self.width))
+            else:
+                warnings.warn("Stadium '{}' is defined incorrectly for {} "
+                    "human(s), r must be positive and t must be "
+                    "nonnegative.".format(self.label,
+                                          np.count_nonzero(invalid)))
             if inID == 'perimwidth':
-                self._set_as_circle(in1 / (2.0 * np.pi))
+                self._set_as_circle(in1 / (2.0 * np.pi), invalid)
                 print("Fix: stadium set as circle with perimeter as given.")
             elif inID == 'depthwidth':
-                self._set_as_circle(0.5 * in2)
+                self._set_as_circle(0.5 * in2, invalid)
                 print("Fix: stadium set as circle with diameter of given "
                         "width.")
             else:
@@ -145,12 +172,16 @@ class Stadium(object):
         else:
             self.alignment = alignment
 
-    def _set_as_circle(self, radius):
-        """Sets radius, perimeter, thickness, and width if thickness is 0."""
-        self.radius = radius
-        self.perimeter = 2.0 * np.pi * self.radius
-        self.thickness = 0.0
-        self.width = self.perimeter / np.pi
+    def _set_as_circle(self, radius, where=None):
+        """Sets radius, perimeter, thickness, and width if thickness is 0.
+        If the stadium holds arrays, where selects the elements to set."""
+        perimeter = 2.0 * np.pi * radius
+        values = {'radius': radius, 'perimeter': perimeter,
+                  'thickness': 0.0, 'width': perimeter / np.pi}
+        for name, value in values.items():
+            if where is not None and np.ndim(where) > 0:
+                value = np.where(where, value, getattr(self, name))
+            setattr(self, name, value)
 
 class Solid(object):
     """Solid. Has two subclasses, stadiumsolid and semiellipsoid. This base
@@ -163,21 +194,31 @@ class Solid(object):
     @property
     def mass(self):
         """Mass of the solid, a float in units of kg."""
+        if self._arrays is not None:
+            return self._arrays.mass[self._index]
+        if self._mass is None:
+            self.calc_rel_properties()
         return self._mass
 
     @property
     def center_of_mass(self):
         """Center of mass of the solid, a np.ndarray of shape (3,1), in
         units of m, expressed in the global frame, from the bottom center of
-        the pelvis (Ls0)."""
+        the pelvis (Ls0). It is calculated when first asked for after the
+        solid is moved."""
+        if self._center_of_mass is None:
+            self.calc_properties()
         return self._center_of_mass
 
     @property
     def inertia(self):
         """Inertia matrix of the solid, a np.array of shape (3,3), in units
         of kg-m^2, about the center of mass of the human, expressed in the
-        global frame.
+        global frame. It is calculated when first asked for after the solid
+        is moved.
         """
+        if self._inertia is None:
+            self.calc_properties()
         return self._inertia
 
     @property
@@ -185,6 +226,10 @@ class Solid(object):
         """Center of mass of the solid, a np.ndarray of shape (3,1), in
         units of m, expressed in the frame of the solid, from the origin of
         the solid."""
+        if self._arrays is not None:
+            return self._arrays.rel_center_of_mass[self._index, :, np.newaxis]
+        if self._rel_center_of_mass is None:
+            self.calc_rel_properties()
         return self._rel_center_of_mass
 
     @property
@@ -192,6 +237,10 @@ class Solid(object):
         """Inertia matrix of the solid, a np.array of shape (3,3), in units
         of kg-m^2, about the center of mass of the solid, expressed in the
         frame of the solid."""
+        if self._arrays is not None:
+            return self._arrays.rel_inertia[self._index]
+        if self._rel_inertia is None:
+            self.calc_rel_properties()
         return self._rel_inertia
 
     @property
@@ -232,11 +281,32 @@ class Solid(object):
         self._rel_inertia = np.zeros((3, 3)) # this gets set in subclasses
         self._mass = 0.0
         self._rel_center_of_mass = np.array([[0.0], [0.0], [0.0]])
+        # Set by _bind.
+        self._arrays = None
+        self._index = None
+
+    def _bind(self, arrays, index):
+        """Makes the mass, relative center of mass, and relative inertia of
+        this solid views onto entry `index` of a yeadon.body.BodyArrays. From
+        then on, the arrays own these properties, and they are not
+        calculated by the solid.
+
+        Parameters
+        ----------
+        arrays : yeadon.body.BodyArrays
+            Arrays holding the properties of all solids of a human.
+        index : int
+            Index of this solid in the arrays.
+
+        """
+        self._arrays = arrays
+        self._index = index
+        del self._mass, self._rel_center_of_mass, self._rel_inertia
 
     def set_orientation(self, proximal_pos, rot_mat, build_toward_positive_z):
-        """Sets the position, rotation matrix of the solid, and calculates
-        the "absolute" properties (center of mass, and inertia tensor) of the
-        solid.
+        """Sets the position, rotation matrix of the solid. The "absolute"
+        properties (center of mass, and inertia tensor) of the solid are
+        calculated when they are first asked for; see calc_properties.
 
         Parameters
         ----------
@@ -262,7 +332,8 @@ class Solid(object):
             self._end_pos = proximal_pos
             self._pos = self._end_pos - (self.height * self._rot_mat @
                     np.array([[0], [0], [1]]))
-        self.calc_properties()
+        self._center_of_mass = None
+        self._inertia = None
 
     def calc_properties(self):
         """Sets the center of mass and inertia of the solid, both with respect
@@ -343,17 +414,69 @@ Inertia tensor in global frame about solid's COM (kg-m^2):
                                   rel_inertia=self.rel_inertia,
                                   inertia=self.inertia))
 
-    def draw_mayavi(self, mlabobj, col):
+    def mesh_points(self):
+        """Returns the x, y, and z coordinates of the points of a surface mesh
+        of the solid, in the global frame. The un-rotated mesh is generated the
+        first time it is needed and kept for later calls.
+
+        Returns
+        -------
+        x, y, z : np.array (rows, columns)
+            Grid of points, as taken by mayavi.mlab.mesh.
+
+        """
+        local = self._local_mesh()
+        points = self._rot_mat @ local.reshape((3, -1)) + self.pos
+        x, y, z = points.reshape(local.shape)
+        return x, y, z
+
+    def _local_mesh(self):
+        """Returns the un-rotated mesh of the solid, an np.array of shape (3,
+        rows, columns) of points in the frame of the solid, from its origin.
+
+        """
         raise NotImplementedError()
 
+    def draw_mayavi(self, mlabobj, col, mesh_points=None):
+        """Draws the solid in 3D using MayaVi.
+
+        Parameters
+        ----------
+        mlabobj :
+            The MayaVi object we can draw on.
+        col : tuple (3,)
+            Color as an rgb tuple, with values between 0 and 1.
+        mesh_points : tuple of np.array, optional
+            The x, y, and z coordinates of the mesh, as returned by
+            mesh_points, e.g. views onto a yeadon.body.BodyMesh. By default,
+            they are calculated by mesh_points.
+
+        """
+        self._generate_mesh(mesh_points)
+        self._mesh = mlabobj.mesh(*self._mesh_points, color=col,
+                opacity=Solid.alpha)
+
+    def _update_mayavi(self, mesh_points=None):
+        """Updates the mesh in MayaVi. See draw_mayavi for the parameter."""
+        self._generate_mesh(mesh_points)
+        self._mesh.mlab_source.set(x=self._mesh_points[0],
+                y=self._mesh_points[1], z=self._mesh_points[2])
+
+    def _generate_mesh(self, mesh_points=None):
+        """Generates grid points for a MayaVi mesh."""
+        if mesh_points is None:
+            mesh_points = self.mesh_points()
+        self._mesh_points = mesh_points
+
 
 class StadiumSolid(Solid):
     """Stadium solid. Derived from the solid class.
 
     """
     def __init__(self, label, density, stadium0, stadium1, height):
-        """Defines a stadium solid object. Creates its base object, and
-        calculates relative/local inertia properties.
+        """Defines a stadium solid object. Creates its base object. The
+        relative/local inertia properties are calculated when first asked
+        for.
 
         Parameters
         ----------
@@ -361,140 +484,92 @@ class StadiumSolid(Solid):
             Name of the solid.
         density : float
             Density of the solid (kg/m^3).
-        stadium0 : :py:class:`Stadium`
-            Lower stadium of the stadium solid.
-        stadium1 : :py:class:`Stadium`
-            Upper stadium of the stadium solid.
+        stadium0 : :py:class:`Stadium` or callable
+            Lower stadium of the stadium solid, or a function without
+            arguments that returns it when it is first needed.
+        stadium1 : :py:class:`Stadium` or callable
+            Upper stadium of the stadium solid, or a function without
+            arguments that returns it when it is first needed.
         height : float
             Distance between the lower and upper stadia.
 
         """
         super(StadiumSolid, self).__init__(label, density, height)
-        self.stads = [stadium0, stadium1]
-        self.alignment = 'ML'
-        # if either stadium is oriented anteroposteriorly.
-        # inertia must be rotated, and the plots must be modified
-        if (self.stads[0].alignment == 'AP' or
-            self.stads[1].alignment == 'AP'):
-            self.alignment = 'AP'
-        if stadium0.thickness == 0:
-            self.degenerate_by_t0 = True
-        else:
-            self.degenerate_by_t0 = False
-        self.calc_rel_properties()
-        self._orig_mesh_points = list()
-        self._orig_mesh_points.append(self._make_mesh(0))
-        self._orig_mesh_points.append(self._make_mesh(1))
+        self._stads = [stadium0, stadium1]
+        # Set by calc_rel_properties when first asked for.
+        self._mass = self._rel_center_of_mass = self._rel_inertia = None
+        # The mesh is only needed for drawing, so it is made on first use.
+        self._unrotated_mesh = None
+
+    @property
+    def stads(self):
+        """The lower and upper stadia, a list of :py:class:`Stadium`'s."""
+        for i, stadium in enumerate(self._stads):
+            if callable(stadium):
+                self._stads[i] = stadium()
+        return self._stads
+
+    @property
+    def alignment(self):
+        """'AP' if either stadium is oriented anteroposteriorly, in which
+        case the inertia must be rotated and the plots must be modified;
+        otherwise 'ML'."""
+        if 'AP' in (self.stads[0].alignment, self.stads[1].alignment):
+            return 'AP'
+        return 'ML'
+
+    @property
+    def degenerate_by_t0(self):
+        """True if the lower stadium has no thickness."""
+        return self.stads[0].thickness == 0
+
+    def _local_mesh(self):
+        """Returns the un-rotated mesh points of the lower and upper stadia,
+        an np.array of shape (3, 2, 20); see Solid._local_mesh.
+
+        """
+        if self._unrotated_mesh is None:
+            self._unrotated_mesh = np.stack([self._make_mesh(0),
+                                             self._make_mesh(1)], axis=1)
+        return self._unrotated_mesh
 
     def calc_rel_properties(self):
         """Calculates mass, relative center of mass, and relative/local
         inertia, according to formulae in Appendix B of Yeadon 1990-ii. If the
         stadium solid is arranged anteroposteriorly, the inertia is rotated
-        by pi/2 about the z axis.
+        by pi/2 about the z axis. See stadium_solid_properties.
 
         """
-        # There are two cases of stadium solid degeneracy to consider:
-        # t0 = 0, and t0 = t1 = 0. The degeneracy arises when b has a
-        # denominator of 0. The case that t1 = 0 is not an issue, then.
-        # The way the case of t0 = 0 is handled is by switching the two stadia.
-        # Note that thi affects how the relative center of mass is set, but
-        # does not affect the mass or moments of inertia calculations.
-        # The case in which t0 = t1 = 0, we set b to 1. That is because t = t0
-        # (1 + bz) is going to be zero anyway, since t0 = 0.
+        # A single solid is computed with floats, which is several times
+        # faster than calling stadium_solid_properties on 0-d arrays.
         D = self.density
         h = self.height
         if self.degenerate_by_t0:
-            # Swap the stadia.
-            r0 = self.stads[1].radius
-            t0 = self.stads[1].thickness
-            r1 = self.stads[0].radius
-            t1 = self.stads[0].thickness
+            # Swap the stadia; see stadium_solid_properties.
+            r0, t0 = self.stads[1].radius, self.stads[1].thickness
+            r1, t1 = self.stads[0].radius, self.stads[0].thickness
         else:
-            r0 = self.stads[0].radius
-            t0 = self.stads[0].thickness
-            r1 = self.stads[1].radius
-            t1 = self.stads[1].thickness
+            r0, t0 = self.stads[0].radius, self.stads[0].thickness
+            r1, t1 = self.stads[1].radius, self.stads[1].thickness
         a = (r1 - r0) / r0
         if t0 == 0:
-            # Truncated cone, since both thicknesses are zero.
-            # b can be anything, because t = t0(1 + bz) = (0)(1 + bz) = 0.
-            b = 1
+            # Truncated cone.
+            b = 1.0
         else:
             b = (t1 - t0) / t0
-        self._mass = D * h * r0 * (4.0 * t0 * self._F1(a,b) +
-                                  np.pi * r0 * self._F1(a,a))
-        zcom = D * (h**2.0) * (4.0 * r0 * t0 * self._F2(a,b) +
-                               np.pi * (r0**2.0) * self._F2(a,a)) / self.mass
+        mass, zcom, Ixcom, Iycom, Izcom = _stadium_solid_integrals(
+                r0, t0, a, b, h, D)
         if self.degenerate_by_t0 and t0 != 0:
-            # We swapped the stadia, and it's not a truncated cone.
-            # Must define this intermediate because zcom above is still what
-            # must be used for the parallel axis theorem below.
-            adjusted_zcom = h - zcom
-        else:
-            adjusted_zcom = zcom
-        self._rel_center_of_mass = np.array([[0.0],[0.0],[adjusted_zcom]])
-
-        # moments of inertia
-        Izcom = D * h * (4.0 * r0 * (t0**3.0) * self._F4(a,b) / 3.0 +
-                         np.pi * (r0**2.0) * (t0**2.0) * self._F5(a,b) +
-                         4.0 * (r0**3.0) * t0 * self._F4(b,a) +
-                         np.pi * (r0**4.0) * self._F4(a,a) * 0.5 )
-        # CAUGHT AN (minor) ERROR IN YEADON'S PAPER HERE. The Dh^3 in the
-        # formula below is missing from the second formula for Iy^0 on page 73
-        # of Yeadon1990-ii.
-        Iy = (D * h * (4.0 * r0 * (t0**3.0) * self._F4(a,b) / 3.0 +
-                       np.pi * (r0**2.0) * (t0**2.0) * self._F5(a,b) +
-                       8.0 * (r0**3.0) * t0*self._F4(b,a) / 3.0 +
-                      np.pi * (r0**4.0) * self._F4(a,a) * 0.25) +
-              D * (h**3.0) * (4.0 * r0 * t0 * self._F3(a,b) +
-                              np.pi * (r0**2.0) * self._F3(a,a)))
-        Iycom = Iy - self.mass * (zcom**2.0)
-        Ix = (D * h * (4.0 * r0 * (t0**3.0) * self._F4(a,b) / 3.0 +
-                       np.pi * (r0**4.0) * self._F4(a,a) * 0.25) +
-              D * (h**3.0) * (4.0 * r0 * t0 * self._F3(a,b) +
-                              np.pi * (r0**2.0) * self._F3(a,a)))
-        Ixcom = Ix - self.mass*(zcom**2.0)
-        self._rel_inertia = np.array([[Ixcom, 0.0, 0.0],
-                                      [0.0, Iycom, 0.0],
-                                      [0.0, 0.0, Izcom]])
+            zcom = h - zcom
         if self.alignment == 'AP':
-            # rearrange to anterorposterior orientation
-            self._rel_inertia = inertia.rotate_inertia(
-                    inertia.rotate_space_123([0, 0, np.pi/2]), self.rel_inertia)
-
-    def draw_mayavi(self, mlabobj, col):
-        """Draws the initial stadium in 3D using MayaVi.
-
-        Parameters
-        ----------
-        mlabobj : mayavi.soemthing
-            The MayaVi object we can draw on.
-        col : tuple (3,)
-            Color as an rgb tuple, with values between 0 and 1.
-
-        """
-        self._generate_mesh()
-        self._mesh = mlabobj.mesh(self._mesh_points['x'], self._mesh_points['y'],
-                self._mesh_points['z'], color=col, opacity=Solid.alpha)
-
-    def _update_mayavi(self):
-        """Updates the mesh in MayaVi."""
-        self._generate_mesh()
-        self._mesh.mlab_source.set(x=self._mesh_points['x'],
-                y=self._mesh_points['y'], z=self._mesh_points['z'])
-
-    def _generate_mesh(self):
-        """Generates grid points for a MayaVi mesh."""
-        X0, Y0, Z0 = self._make_pos(0)
-        X1, Y1, Z1 = self._make_pos(1)
-        Xpts = np.array(np.concatenate( (X0, X1), axis=0))
-        Ypts = np.array(np.concatenate( (Y0, Y1), axis=0))
-        Zpts = np.array(np.concatenate( (Z0, Z1), axis=0))
-        self._mesh_points = {'x': Xpts, 'y': Ypts, 'z': Zpts}
+            Ixcom, Iycom = Iycom, Ixcom
+        self._mass = float(mass)
+        self._rel_center_of_mass = np.array([[0.0], [0.0], [float(zcom)]])
+        self._rel_inertia = np.diag([Ixcom, Iycom, Izcom])
 
     def _make_mesh(self, i):
         """Generates the un-rotated coordinates of the solid. These values are
-        saved at instantiation.
+        generated the first time they are needed; see _local_mesh.
 
         Parameters
         ----------
@@ -519,17 +594,6 @@ class StadiumSolid(Solid):
         POSES = np.concatenate( (X, Y, Z), axis=0)
         return POSES
 
-    def _make_pos(self, i):
-        """Generates coordinates to be used for 3D visualization purposes.
-
-        """
-        rotated_points = self._rot_mat @ self._orig_mesh_points[i]
-        X, Y, Z = np.vsplit(rotated_points, 3)
-        X = X + self.pos[0]
-        Y = Y + self.pos[1]
-        Z = Z + self.pos[2]
-        return X, Y, Z
-
     @staticmethod
     def _F1(a, b):
         """Integration term. See Yeadon 1990-ii Appendix 2."""
@@ -557,15 +621,123 @@ class StadiumSolid(Solid):
         return (1.0 + (a + b) + (a**2.0 + 4.0 * a * b + b**2.0) / 3.0 +
                        a * b * (a + b) * 0.5 + (a**2.0) * (b**2.0) * 0.2)
 
+
+def _stadium_solid_integrals(r0, t0, a, b, h, D):
+    """Returns the mass, the height of the center of mass, and the principal
+    moments of inertia about the center of mass (Ixcom, Iycom, Izcom) of
+    stadium solids whose degeneracy has been resolved (see
+    stadium_solid_properties), for floats or arrays. The center of mass is
+    measured from the stadium of radius r0 and thickness t0, and a and b are
+    the rates at which the radius and thickness grow along the height.
+
+    """
+    F1 = StadiumSolid._F1
+    F2 = StadiumSolid._F2
+    F3 = StadiumSolid._F3
+    F4 = StadiumSolid._F4
+    F5 = StadiumSolid._F5
+    mass = D * h * r0 * (4.0 * t0 * F1(a,b) + np.pi * r0 * F1(a,a))
+    zcom = D * (h**2.0) * (4.0 * r0 * t0 * F2(a,b) +
+                           np.pi * (r0**2.0) * F2(a,a)) / mass
+
+    # moments of inertia
+    Izcom = D * h * (4.0 * r0 * (t0**3.0) * F4(a,b) / 3.0 +
+                     np.pi * (r0**2.0) * (t0**2.0) * F5(a,b) +
+                     4.0 * (r0**3.0) * t0 * F4(b,a) +
+                     np.pi * (r0**4.0) * F4(a,a) * 0.5 )
+    # CAUGHT AN (minor) ERROR IN YEADON'S PAPER HERE. The Dh^3 in the
+    # formula below is missing from the second formula for Iy^0 on page 73
+    # of Yeadon1990-ii.
+    Iy = (D * h * (4.0 * r0 * (t0**3.0) * F4(a,b) / 3.0 +
+                   np.pi * (r0**2.0) * (t0**2.0) * F5(a,b) +
+                   8.0 * (r0**3.0) * t0*F4(b,a) / 3.0 +
+                   np.pi * (r0**4.0) * F4(a,a) * 0.25) +
+          D * (h**3.0) * (4.0 * r0 * t0 * F3(a,b) +
+                          np.pi * (r0**2.0) * F3(a,a)))
+    Iycom = Iy - mass * (zcom**2.0)
+    Ix = (D * h * (4.0 * r0 * (t0**3.0) * F4(a,b) / 3.0 +
+                   np.pi * (r0**4.0) * F4(a,a) * 0.25) +
+          D * (h**3.0) * (4.0 * r0 * t0 * F3(a,b) +
+                          np.pi * (r0**2.0) * F3(a,a)))
+    Ixcom = Ix - mass*(zcom**2.0)
+    return mass, zcom, Ixcom, Iycom, Izcom
+
+
+def stadium_solid_properties(r0, t0, r1, t1, height, density,
+                             alignment='ML'):
+    """Returns the mass, center of mass, and principal moments of inertia of
+    any number of stadium solids, according to formulae in Appendix B of
+    Yeadon 1990-ii (see StadiumSolid). All arguments are broadcast against
+    each other, so that the properties of many solids can be computed at
+    once.
+
+    Parameters
+    ----------
+    r0, t0 : array_like
+        Radius and thickness of the lower stadium of each solid (m).
+    r1, t1 : array_like
+        Radius and thickness of the upper stadium of each solid (m).
+    height : array_like
+        Distance between the lower and upper stadia (m).
+    density : array_like
+        Density of each solid (kg/m^3).
+    alignment : array_like of str, optional
+        'ML' or 'AP' for each solid; see StadiumSolid. The moments of inertia
+        of 'AP' solids are those of the solid rotated by pi/2 about its z
+        axis.
+
+    Returns
+    -------
+    mass : np.array
+        Mass of each solid (kg).
+    zcom : np.array
+        Height of the center of mass of each solid above its lower stadium
+        (m). The center of mass is on the z axis of the solid.
+    moments : np.array (..., 3)
+        Moments of inertia of each solid about the x, y and z axes through
+        its center of mass, in the frame of the solid (kg-m^2). The products
+        of inertia are zero.
+
+    """
+    r0, t0, r1, t1, h, D = np.broadcast_arrays(*(np.asarray(x) for x in
+        (r0, t0, r1, t1, height, density)))
+    # There are two cases of stadium solid degeneracy to consider:
+    # t0 = 0, and t0 = t1 = 0. The degeneracy arises when b has a
+    # denominator of 0. The case that t1 = 0 is not an issue, then.
+    # The way the case of t0 = 0 is handled is by switching the two stadia.
+    # Note that thi affects how the relative center of mass is set, but
+    # does not affect the mass or moments of inertia calculations.
+    # The case in which t0 = t1 = 0, we set b to 1. That is because t = t0
+    # (1 + bz) is going to be zero anyway, since t0 = 0.
+    swapped = t0 == 0
+    r0, r1 = np.where(swapped, r1, r0), np.where(swapped, r0, r1)
+    t0, t1 = np.where(swapped, t1, t0), np.where(swapped, t0, t1)
+    cone = t0 == 0
+    a = (r1 - r0) / r0
+    # Truncated cone, since both thicknesses are zero.
+    # b can be anything, because t = t0(1 + bz) = (0)(1 + bz) = 0.
+    b = np.where(cone, 1.0, (t1 - t0) / np.where(cone, 1.0, t0))
+    mass, zcom, Ixcom, Iycom, Izcom = _stadium_solid_integrals(r0, t0, a, b,
+                                                                 h, D)
+    # If we swapped the stadia, and it's not a truncated cone, the center of
+    # mass is measured from the other end.
+    adjusted_zcom = np.where(swapped & ~cone, h - zcom, zcom)
+    # Rotating an anteroposterior solid by pi/2 about z swaps Ix and Iy.
+    ap = np.broadcast_to(np.asarray(alignment) == 'AP', mass.shape)
+    moments = np.stack([np.where(ap, Iycom, Ixcom),
+                        np.where(ap, Ixcom, Iycom), Izcom], axis=-1)
+    return mass, adjusted_zcom, moments
+
+
 class Semiellipsoid(Solid):
     """Semiellipsoid."""
 
     n_mesh_points = 30
-    def __init__(self,label,density,baseperim,height):
-        """Defines a semiellipsoid (solid) object. Creates its base object, and
-        calculates relative/local inertia properties. The base is circular (its
-        height axis is pointed upwards), so only 2 parameters are needed to
-        define the semiellipsoid.
+    def __init__(self, label, density, baseperim, height):
+        """Defines a semiellipsoid (solid) object. Creates its base object.
+        The relative/local inertia properties are calculated when first asked
+        for. The base is circular (its height axis is pointed upwards), so
+        only 2 parameters are needed to define the semiellipsoid.
 
         Parameters
         ----------
@@ -582,55 +754,34 @@ class Semiellipsoid(Solid):
         super(Semiellipsoid, self).__init__(label, density, height)
         self.baseperimeter = baseperim
         self.radius = self.baseperimeter/(2.0*np.pi)
-        self.calc_rel_properties()
-        self._mesh_x, self._mesh_y, self._mesh_z = self._make_mesh()
+        # Set by calc_rel_properties when first asked for.
+        self._mass = self._rel_center_of_mass = self._rel_inertia = None
+        # The mesh is only needed for drawing, so it is made on first use.
+        self._unrotated_mesh = None
 
-    def calc_rel_properties(self):
-        """Calculates mass, relative center of mass, and relative/local
-        inertia, according to somewhat commonly availble formulae.
+    def _local_mesh(self):
+        """Returns the un-rotated mesh points of the solid, an np.array of
+        shape (3, n_mesh_points, n_mesh_points); see Solid._local_mesh.
 
         """
-        D = self.density
-        r = self.radius
-        h = self.height
-        self._mass = D * 2.0/3.0 * np.pi * (r**2) * h
-        self._rel_center_of_mass = np.array([[0.0],[0.0],[3.0/8.0 * h]])
-        Izcom = D * 4.0/15.0 * np.pi * (r**4.0) * h
-        Iycom = D * np.pi * (2.0/15.0 * (r**2.0) * h * (r**2.0 + h**2.0) -
-            3.0/32.0 * (r**2.0) * (h**3.0))
-        Ixcom = Iycom
-        self._rel_inertia = np.array([[Ixcom, 0.0, 0.0],
-                                      [0.0, Iycom, 0.0],
-                                      [0.0, 0.0, Izcom]])
-
-    def draw_mayavi(self, mlabobj, col):
-        """Draws the semiellipsoid in 3D using MayaVi.
+        if self._unrotated_mesh is None:
+            self._unrotated_mesh = np.array(self._make_mesh())
+        return self._unrotated_mesh
 
-        Parameters
-        ----------
-        mlabobj :
-            The MayaVi object we can draw on.
-        col : tuple (3,)
-            Color as an rgb tuple, with values between 0 and 1.
+    def calc_rel_properties(self):
+        """Calculates mass, relative center of mass, and relative/local
+        inertia, according to somewhat commonly availble formulae.
 
         """
-        self._generate_mesh()
-        self._mesh = mlabobj.mesh(*self._mesh_points, color=col,
-                opacity=Solid.alpha)
-
-    def _update_mayavi(self):
-        """Updates the mesh in MayaVi."""
-        self._generate_mesh()
-        self._mesh.mlab_source.set(x=self._mesh_points[0],
-                y=self._mesh_points[1], z=self._mesh_points[2])
-
-    def _generate_mesh(self):
-        """Generates a mesh for MayaVi."""
-        self._mesh_points = self._make_pos()
+        mass, zcom, moments = semiellipsoid_properties(self.radius,
+                self.height, self.density)
+        self._mass = float(mass)
+        self._rel_center_of_mass = np.array([[0.0], [0.0], [float(zcom)]])
+        self._rel_inertia = np.diag(moments)
 
     def _make_mesh(self):
         """Generates the un-rotated coordinates of the solid. These values are
-        saved at instantiation.
+        generated the first time they are needed; see _local_mesh.
 
         """
         u = np.linspace(0, 2.0 * np.pi, self.n_mesh_points)
@@ -640,25 +791,38 @@ class Semiellipsoid(Solid):
         z = self.height * np.outer(np.ones(np.size(u)), np.cos(v))
         return x, y, z
 
-    def _make_pos(self):
-        """Generates coordinates to be used for 3D visualization purposes,
-        given the position and orientation of the solid.
 
-        """
-        x = np.zeros(self._mesh_x.shape)
-        y = np.zeros(self._mesh_y.shape)
-        z = np.zeros(self._mesh_z.shape)
-        for i in np.arange(self.n_mesh_points):
-            for j in np.arange(self.n_mesh_points):
-                POS = np.array([
-                    [self._mesh_x[i,j]],
-                    [self._mesh_y[i,j]],
-                    [self._mesh_z[i,j]]])
-                POS = self._rot_mat @ POS
-                x[i,j] = POS[0,0]
-                y[i,j] = POS[1,0]
-                z[i,j] = POS[2,0]
-        x = self.pos[0,0] + x
-        y = self.pos[1,0] + y
-        z = self.pos[2,0] + z
-        return x, y, z
+def semiellipsoid_properties(radius, height, density):
+    """Returns the mass, center of mass, and principal moments of inertia of
+    any number of semiellipsoids with circular bases (see Semiellipsoid). All
+    arguments are broadcast against each other.
+
+    Parameters
+    ----------
+    radius : array_like
+        Radius of the base of each semiellipsoid (m).
+    height : array_like
+        Height of each semiellipsoid above its base (m).
+    density : array_like
+        Density of each semiellipsoid (kg/m^3).
+
+    Returns
+    -------
+    mass : np.array
+        Mass of each semiellipsoid (kg).
+    zcom : np.array
+        Height of the center of mass of each semiellipsoid above its base (m).
+    moments : np.array (..., 3)
+        Moments of inertia of each semiellipsoid about the x, y and z axes
+        through its center of mass (kg-m^2).
+
+    """
+    r, h, D = np.broadcast_arrays(*(np.asarray(x) for x in
+                                    (radius, height, density)))
+    mass = D * 2.0/3.0 * np.pi * (r**2) * h
+    zcom = 3.0/8.0 * h
+    Izcom = D * 4.0/15.0 * np.pi * (r**4.0) * h
+    Iycom = D * np.pi * (2.0/15.0 * (r**2.0) * h * (r**2.0 + h**2.0) -
+        3.0/32.0 * (r**2.0) * (h**3.0))
+    Ixcom = Iycom
+    return mass, zcom, np.stack([Ixcom, Iycom, Izcom], axis=-1)
@@ -0,0 +1,70 @@
+import csv
+import os
+from io import StringIO
+
+import unittest
+from numpy import testing
+
+import yeadon.human as hum
+from yeadon import batch
+
+testdir = os.path.split(__file__)[0]
+measdir = os.path.join(testdir, '..', '..', 'misc', 'samplemeasurements')
+
+
+class TestBatch(unittest.TestCase):
+    """Tests the functions of the :py:mod:`batch` module."""
+
+    files = [os.path.join(measdir, 'male1.txt'),
+             os.path.join(testdir, 'male1_badval.txt'),
+             os.path.join(measdir, 'male2.txt')]
+    CFG = os.path.join(testdir, 'CFG_output_des.txt')
+
+    def assert_rows(self, rows, CFG=None):
+        self.assertEqual([row['measurements'] for row in rows], self.files)
+        self.assertEqual(rows[1]['error'],
+                         'ValueError: Variable Ls1L has inappropriate value.')
+        self.assertEqual(rows[1]['mass'], '')
+        for row in [rows[0], rows[2]]:
+            self.assertEqual(row['error'], '')
+            h = hum.Human(row['measurements'], CFG=CFG)
+            self.assertEqual(float(row['mass']), h.mass)
+            testing.assert_array_equal(
+                    [float(row[key]) for key in ['x', 'y', 'z']],
+                    h.center_of_mass[:, 0])
+            testing.assert_array_equal(
+                    [float(row[key]) for key in
+                     ['Ixx', 'Ixy', 'Ixz', 'Iyy', 'Iyz', 'Izz']],
+                    h.inertia[[0, 0, 0, 1, 1, 2], [0, 1, 2, 1, 2, 2]])
+
+    def test_failure_isolation(self):
+        """A bad file does not stop the batch, in this process or in a
+        pool."""
+        for workers, chunksize in [(1, 1), (2, 1), (2, 2)]:
+            rows = list(batch.batch_properties(self.files, workers=workers,
+                                               chunksize=chunksize))
+            self.assert_rows(rows)
+
+    def test_CFG_and_table(self):
+        rows = list(batch.batch_properties(self.files, CFG_files=self.CFG,
+                                           workers=1))
+        self.assertEqual(rows[0]['CFG'], self.CFG)
+        self.assert_rows(rows, CFG=self.CFG)
+
+        stream = StringIO()
+        self.assertEqual(batch.write_table(rows, stream), (3, 1))
+        stream.seek(0)
+        self.assert_rows(list(csv.DictReader(stream)), CFG=self.CFG)
+
+        self.assertRaises(ValueError, batch.batch_properties, self.files,
+                          CFG_files=[self.CFG, self.CFG])
+        self.assertRaises(ValueError, batch.batch_properties, self.files,
+                          workers=0)
+
+    def test_find_files(self):
+        files = ['female1.txt', 'male1.txt', 'male2.txt', 'male3.txt',
+                 'male4.txt']
+        self.assertEqual(batch.find_files(measdir),
+                         [os.path.join(measdir, f) for f in files])
+        self.assertEqual(batch.find_files(os.path.join(measdir, 'male*.txt')),
+                         [os.path.join(measdir, f) for f in files[1:]])
@@ -0,0 +1,73 @@
+import os
+import warnings
+
+import unittest
+import numpy as np
+from numpy import testing
+
+import yeadon.human as hum
+import yeadon.segment as seg
+from yeadon.body import BodyArrays
+
+warnings.filterwarnings('ignore', category=DeprecationWarning)
+
+
+class TestBodyArrays(unittest.TestCase):
+    """Tests the :py:class:`BodyArrays` class."""
+
+    male1meas = os.path.join(os.path.split(__file__)[0], '..', '..',
+            'misc', 'samplemeasurements', 'male1.txt')
+
+    def test_human_arrays(self):
+        """The solids and segments of a human are views onto its arrays."""
+        h = hum.Human(self.male1meas)
+        arrays = h._body_arrays
+        assert isinstance(arrays, BodyArrays)
+
+        self.assertEqual(arrays.mass.shape, (40,))
+        self.assertEqual(arrays.rel_center_of_mass.shape, (40, 3))
+        self.assertEqual(arrays.rel_inertia.shape, (40, 3, 3))
+        self.assertEqual(arrays.height.shape, (40,))
+        self.assertEqual(arrays.segment_rel_inertia.shape, (11, 3, 3))
+        self.assertEqual(arrays.segment_names,
+                ('P', 'T', 'C', 'A1', 'A2', 'B1', 'B2', 'J1', 'J2', 'K1',
+                 'K2'))
+
+        for index, label in enumerate(arrays.solid_labels):
+            s = h.get_segment_by_name(
+                    arrays.segment_names[arrays.segment_index[index]])
+            solid = [x for x in s.solids if x.label == label][0]
+            self.assertEqual(solid.mass, arrays.mass[index])
+            self.assertEqual(solid.height, arrays.height[index])
+            assert np.shares_memory(solid.rel_inertia, arrays.rel_inertia)
+            assert np.shares_memory(solid.rel_center_of_mass,
+                                    arrays.rel_center_of_mass)
+        assert np.shares_memory(h.A2.rel_inertia, arrays.segment_rel_inertia)
+        assert np.shares_memory(h.A2.inertia, arrays.segment_inertia)
+
+        # Writing to the arrays is seen through the views.
+        arrays.mass[0] = 1.0
+        self.assertEqual(h.P.solids[0].mass, 1.0)
+
+    def test_same_as_segment(self):
+        """The vectorized properties are identical to those calculated by
+        each segment on its own."""
+        h = hum.Human(self.male1meas)
+        h.set_CFG_dict(dict((key, 0.2) for key in h.CFGnames))
+        for s in h.segments:
+            standalone = seg.Segment(s.label, s.pos, s.rot_mat, s.solids,
+                    s.color, s._build_toward_positive_z)
+            standalone.calc_properties()
+            self.assertEqual(s.mass, standalone.mass)
+            testing.assert_array_equal(s.rel_center_of_mass,
+                                       standalone.rel_center_of_mass)
+            testing.assert_array_equal(s.rel_inertia, standalone.rel_inertia)
+            testing.assert_array_equal(s.center_of_mass,
+                                       standalone.center_of_mass)
+            testing.assert_array_equal(s.inertia, standalone.inertia)
+
+        mass, center_of_mass, inertia = h.combine_inertia(
+                [s.label[:s.label.index(':')] for s in h.segments])
+        testing.assert_allclose(h.mass, mass)
+        testing.assert_allclose(h.center_of_mass, center_of_mass, atol=1e-15)
+        testing.assert_allclose(h.inertia, inertia, atol=1e-15)
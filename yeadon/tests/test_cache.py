@@ -0,0 +1,123 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+from numpy import testing
+
+from yeadon.human import Human
+from yeadon.cache import HumanCache, human_key
+
+measdir = os.path.join(os.path.split(__file__)[0], '..', '..', 'misc',
+                       'samplemeasurements')
+male1meas = os.path.join(measdir, 'male1.txt')
+male2meas = os.path.join(measdir, 'male2.txt')
+male4meas = os.path.join(measdir, 'male4.txt')
+CFGfile = os.path.join(os.path.split(__file__)[0], 'CFG_output_des.txt')
+
+
+class TestHumanCache(unittest.TestCase):
+
+    def test_hits_and_copies(self):
+        cache = HumanCache(maxsize=4)
+        h1 = cache.get(male1meas)
+        info = cache.info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (0, 1, 1))
+
+        CFG = dict((name, 0.0) for name in Human.CFGnames)
+        CFG['somersault'] = 0.5
+        h2 = cache.get(male1meas, CFG=CFG)
+        self.assertEqual(cache.info().hits, 1)
+        self.assertIsNot(h1, h2)
+        self.assertEqual(h1.CFG['somersault'], 0.0)
+        self.assertEqual(h2.CFG['somersault'], 0.5)
+
+        # The copies are independent of the cached human.
+        h1.set_CFG('PTsagittalFlexion', 0.3)
+        shared = cache.get(male1meas, copy_human=False)
+        self.assertEqual(shared.CFG['PTsagittalFlexion'], 0.0)
+        self.assertIs(shared, cache.get(male1meas, copy_human=False))
+        with self.assertRaises(ValueError):
+            cache.get(male1meas, CFG=CFG, copy_human=False)
+
+        # A configuration file is applied to the copy.
+        h3 = cache.get(male1meas, CFG=CFGfile)
+        self.assertEqual(cache.info().hits, 4)
+        h = Human(male1meas, CFG=CFGfile)
+        self.assertEqual(h3.CFG, h.CFG)
+        testing.assert_allclose(h3.inertia, h.inertia, atol=1e-15)
+
+        h = Human(male1meas)
+        h.set_CFG('somersault', 0.5)
+        testing.assert_allclose(h2.mass, h.mass)
+        testing.assert_allclose(h2.center_of_mass, h.center_of_mass)
+        testing.assert_allclose(h2.inertia, h.inertia, atol=1e-15)
+
+        # The options are part of the key.
+        cache.get(male1meas, symmetric=False)
+        cache.get(male1meas, density_set='Chandler')
+        self.assertEqual(cache.info().misses, 3)
+
+        cache.clear()
+        self.assertEqual(cache.info(), (0, 0, 0, 4, 0))
+
+    def test_file_read_once(self):
+        """A miss reads the measurement file only once, and the human built
+        from it is the one built from the file."""
+        cache = HumanCache()
+        read_measurements = Human.read_measurements
+        with mock.patch.object(Human, 'read_measurements',
+                               side_effect=read_measurements) as read:
+            h = cache.get(male4meas)
+            self.assertEqual(read.call_count, 1)
+            cache.get(male4meas)
+            self.assertEqual(read.call_count, 2)
+        expected = Human(male4meas)
+        self.assertEqual(h.meas_mass, expected.meas_mass)
+        self.assertEqual(h.mass, expected.mass)
+        testing.assert_array_equal(h.inertia, expected.inertia)
+
+    def test_measurementconversionfactor(self):
+        """A copy takes the measurementconversionfactor of its own input,
+        which is not part of the key."""
+        cache = HumanCache()
+        meas = Human.read_measurements(male1meas)[0]
+        self.assertEqual(cache.get(meas).measurementconversionfactor, 1)
+        self.assertEqual(
+                cache.get(male1meas).measurementconversionfactor,
+                Human(male1meas).measurementconversionfactor)
+        self.assertEqual(cache.get(meas).measurementconversionfactor, 1)
+        self.assertEqual(cache.info().misses, 1)
+
+    def test_key_and_eviction(self):
+        # The key depends on the measurements, not on the path or the
+        # formatting of the file.
+        key = human_key(male1meas)
+        tmpdir = tempfile.mkdtemp()
+        try:
+            copied = os.path.join(tmpdir, 'male1.txt')
+            shutil.copy(male1meas, copied)
+            self.assertEqual(human_key(copied), key)
+            # Written in meters, in a different order.
+            reformatted = os.path.join(tmpdir, 'male1_meters.txt')
+            Human(male1meas, symmetric=False).write_measurements(reformatted)
+            self.assertEqual(human_key(reformatted), key)
+        finally:
+            shutil.rmtree(tmpdir)
+        self.assertNotEqual(key, human_key(male2meas))
+        meas = Human.read_measurements(male1meas)[0]
+        self.assertEqual(human_key(meas), key)
+        self.assertEqual(human_key(dict(meas)), key)
+        self.assertNotEqual(human_key(meas, symmetric=False), key)
+        with self.assertRaises(ValueError):
+            human_key(np.zeros(95))
+
+        cache = HumanCache(maxsize=1)
+        cache.get(male1meas)
+        cache.get(male2meas)
+        cache.get(male1meas)
+        self.assertEqual(cache.info(), (0, 3, 2, 1, 1))
+        with self.assertRaises(ValueError):
+            HumanCache(maxsize=0)
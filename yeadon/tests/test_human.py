@@ -6,6 +6,8 @@ import warnings
 from io import StringIO
 
 import unittest
+from concurrent import futures
+
 import numpy as np
 from numpy import testing, pi
 
@@ -289,6 +291,9 @@ class TestHuman(unittest.TestCase):
         self.assertEqual(h._s[7].label, 's7: above ear')
         testing.assert_almost_equal(h._s[7].density,
                 h.segmental_densities['Dempster']['head-neck'])
+        # The base of the head is the measured perimeter, not the one of
+        # the Ls7 stadium, which is recomputed from its radius.
+        self.assertEqual(h._s[7].baseperimeter, meas['Ls7p'])
 
         # arms
         # 'a'
@@ -840,6 +845,21 @@ class TestHuman(unittest.TestCase):
             self.assertEqual(str(e),
                     "'testing' is not a correct variable name.")
 
+    def test_set_CFG_dict_in_place(self):
+        """Modifying the human's own CFG dict and passing it back must
+        update the pose."""
+
+        h = hum.Human(self.male1meas)
+        CFG = h.CFG
+        CFG['CA1extension'] = 0.5
+        h.set_CFG_dict(CFG)
+
+        h2 = hum.Human(self.male1meas)
+        h2.set_CFG('CA1extension', 0.5)
+
+        testing.assert_allclose(h.inertia, h2.inertia)
+        testing.assert_allclose(h.center_of_mass, h2.center_of_mass)
+
     def test_crazy_CFG_regression(self):
         """Puts the human in a crazy configuration (all angles are non-zero)
         and compares all 3 inertial properties.
@@ -943,11 +963,16 @@ class TestHuman(unittest.TestCase):
         # Make sure all density values are scaled appropriately.
         factor = h2.mass / h.mass
 
-        # Make sure densities are scaled correctly.
-        for key, val in h.segmental_densities.items():
+        # Make sure densities are scaled correctly, only for the scaled
+        # human.
+        for key, val in h2.segmental_densities.items():
             for seg, dens in val.items():
                 self.assertEqual(dens,
                         segmental_densities_des[key][seg] * factor)
+        self.assertEqual(h.segmental_densities, segmental_densities_des)
+        self.assertEqual(hum.Human.segmental_densities,
+                         segmental_densities_des)
+        self.assertEqual(hum.Human(self.male1meas).mass, h.mass)
 
         # Check a few individual segments and solids.
         testing.assert_almost_equal(h2.K1.mass, h.K1.mass * factor)
@@ -971,6 +996,82 @@ class TestHuman(unittest.TestCase):
                 self.assertEqual(dens,
                         segmental_densities_des[key][seg] * factor * factor2)
 
+    def test_scale_human_by_mass_without_update(self):
+        """Scaling the mass gives the human that defining the solids again
+        with the scaled densities gives."""
+        h = hum.Human(self.male1meas)
+        h.set_CFG('somersault', 0.4)
+        h.set_CFG('CA1extension', 0.4)
+        h.scale_human_by_mass(70.0)
+        h_des = copy.deepcopy(h)
+        h_des.update()
+        testing.assert_allclose(h.mass, 70.0)
+        testing.assert_allclose(h.mass, h_des.mass)
+        testing.assert_allclose(h.center_of_mass, h_des.center_of_mass,
+                                atol=1e-15)
+        testing.assert_allclose(h.inertia, h_des.inertia, atol=1e-14)
+        for name in hum.Human.objnames:
+            obj = h._objects[name]
+            obj_des = h_des._objects[name]
+            testing.assert_allclose(obj.mass, obj_des.mass)
+            testing.assert_allclose(obj.rel_inertia, obj_des.rel_inertia,
+                                    atol=1e-15)
+            testing.assert_allclose(obj.inertia, obj_des.inertia, atol=1e-15)
+        for solid, solid_des in zip(h.A1.solids, h_des.A1.solids):
+            testing.assert_allclose(solid.density, solid_des.density)
+
+    def test_set_densities(self):
+        """Density sets and custom densities, without defining the solids
+        again."""
+        h = hum.Human(self.male1meas)
+        h.set_CFG('somersault', 0.3)
+        h.set_CFG('CA1extension', 0.5)
+        density_sets = ['Chandler', 'Clauser', 'Dempster']
+        masses, centers_of_mass, inertias = \
+                h.calc_properties_densities(density_sets)
+        for density_set, mass, center_of_mass, inertia_ in zip(
+                density_sets, masses, centers_of_mass, inertias):
+            h_des = hum.Human(self.male1meas, density_set=density_set)
+            h_des.set_CFG('somersault', 0.3)
+            h_des.set_CFG('CA1extension', 0.5)
+            testing.assert_allclose(mass, h_des.mass)
+            testing.assert_allclose(center_of_mass,
+                                    h_des.center_of_mass[:, 0], atol=1e-15)
+            testing.assert_allclose(inertia_, h_des.inertia, atol=1e-14)
+
+            h.set_densities(density_set)
+            testing.assert_array_equal(h.solid_densities,
+                                       h_des.solid_densities)
+            testing.assert_allclose(h.mass, h_des.mass)
+            testing.assert_allclose(h.inertia, h_des.inertia, atol=1e-14)
+            testing.assert_allclose(h.K1.inertia, h_des.K1.inertia,
+                                    atol=1e-15)
+            testing.assert_allclose(h.K1.solids[0].inertia,
+                                    h_des.K1.solids[0].inertia, atol=1e-15)
+
+        # Custom densities are kept when the solids are defined again.
+        thigh_mass = h.J1.solids[0].mass
+        h.set_densities({'thigh': 2100})
+        testing.assert_allclose(h.J1.solids[0].mass, 2 * thigh_mass)
+        self.assertEqual(h.solid_densities[hum.Human.objnames.index('s0')],
+                         1010)
+        mass = h.mass
+        h.update()
+        testing.assert_allclose(h.mass, mass)
+        testing.assert_allclose(
+                h.calc_properties_densities([h.solid_densities])[0], mass)
+
+        densities = np.full(40, 1000.0)
+        h.set_densities(densities)
+        testing.assert_array_equal(h.solid_densities, densities)
+        h.set_densities('Dempster')
+        testing.assert_allclose(h.mass, hum.Human(self.male1meas).mass)
+
+        self.assertRaises(Exception, h.set_densities, 'Yeadon')
+        self.assertRaises(ValueError, h.set_densities, {'neck': 1000})
+        self.assertRaises(ValueError, h.set_densities, np.ones(39))
+        self.assertRaises(ValueError, h.set_densities, np.zeros(40))
+
     def test_read_measurements(self):
         # -- Measurement input file errors.
         measPath = os.path.join(os.path.split(__file__)[0],
@@ -1118,12 +1219,66 @@ class TestHuman(unittest.TestCase):
 
         os.remove(path)
 
+    def test_snapshot(self):
+        """A human loaded from a snapshot is the human that was saved."""
+        path = os.path.join(os.path.split(__file__)[0], 'snapshot.npy')
+        scalemeas = os.path.join(os.path.split(__file__)[0],
+                                 'male1_scale.txt')
+        h = hum.Human(scalemeas, symmetric=False, density_set='Chandler')
+        h.set_densities({'thorax': 1100.0})
+        h.set_CFG('CA1extension', 0.5)
+        h.set_CFG('twist', 0.3)
+        h.translate_coord_sys([0.1, 0.2, 0.3])
+        h.save_snapshot(path)
+        try:
+            h2 = hum.Human.load_snapshot(path)
+        finally:
+            os.remove(path)
+
+        self.assertEqual(h2.meas, h.meas)
+        self.assertEqual(h2.CFG, h.CFG)
+        self.assertEqual(h2.meas_mass, h.meas_mass)
+        self.assertEqual(h2.is_symmetric, False)
+        self.assertEqual(h2._density_set, 'Chandler')
+        self.assertEqual(h2.segmental_densities, h.segmental_densities)
+        testing.assert_array_equal(h2.solid_densities, h.solid_densities)
+        testing.assert_array_equal(h2._body_arrays.rel_inertia,
+                                   h._body_arrays.rel_inertia)
+        # The properties of the solids are views onto the file.
+        self.assertIsInstance(h2._body_arrays.rel_inertia.base, np.memmap)
+        self.assertEqual(h2.J2.solids[0].mass, h.J2.solids[0].mass)
+        self.assertEqual(h2.mass, h.mass)
+        testing.assert_allclose(h2.center_of_mass, h.center_of_mass,
+                                atol=1e-15)
+        testing.assert_allclose(h2.inertia, h.inertia, atol=1e-14)
+        testing.assert_allclose(h2.J2.end_pos, h.J2.end_pos, atol=1e-15)
+
+        # The stadia are defined only when the solids are drawn.
+        self.assertIsNone(h2._stadia)
+        testing.assert_allclose(h2.mesh_vertices()[0],
+                                h.mesh_vertices()[0], atol=1e-15)
+        self.assertIsNotNone(h2._stadia)
+        self.assertEqual(h2._Ls[4].width, h._Ls[4].width)
+
+        # The loaded human can be changed like any other.
+        for human in (h, h2):
+            human.set_CFG('PJ1extension', 0.4)
+            human.set_densities({'thorax': 1000.0})
+        testing.assert_allclose(h2.inertia, h.inertia, atol=1e-14)
+
+        # Other files are rejected.
+        np.save(path, np.zeros(3))
+        try:
+            with self.assertRaises(ValueError):
+                hum.Human.load_snapshot(path)
+        finally:
+            os.remove(path)
+
     def test_translate_coord_sys(self):
         """Just translates once and makes sure only COM changes."""
-        # TODO this method has been hidden for v1.0 release.
         h = hum.Human(self.male1meas)
         h2 = hum.Human(self.male1meas)
-        h2._translate_coord_sys([1, 2, 3])
+        h2.translate_coord_sys([1, 2, 3])
 
         testing.assert_almost_equal(h2.mass, h.mass)
         testing.assert_allclose(h2.center_of_mass,
@@ -1131,15 +1286,132 @@ class TestHuman(unittest.TestCase):
         testing.assert_allclose(h2.inertia, h.inertia, atol=1e-15)
 
     def test_rotate_coord_sys(self):
-        # TODO Check out properties again.
+        """Rotating the coordinate system is the same as rotating the pelvis
+        by the root variables."""
         h = hum.Human(self.male1meas)
-        # TODO this method has been hidden for v1.0 release.
-        pass
+        h.set_CFG('CA1extension', 0.5)
+        h.rotate_coord_sys([0.3, 0.0, 0.0])
+        h2 = hum.Human(self.male1meas)
+        h2.set_CFG('CA1extension', 0.5)
+        h2.set_CFG('somersault', 0.3)
+        testing.assert_allclose(h.center_of_mass, h2.center_of_mass,
+                                atol=1e-15)
+        testing.assert_allclose(h.inertia, h2.inertia, atol=1e-14)
+        testing.assert_allclose(h.A2.end_pos, h2.A2.end_pos, atol=1e-15)
+        self.assertRaises(ValueError, h.rotate_coord_sys, np.eye(2))
 
     def test_transform_coord_sys(self):
-        # TODO this can be simple.
-        # TODO this method has been hidden for v1.0 release.
-        pass
+        h = hum.Human(self.male1meas)
+        h.transform_coord_sys([1, 2, 3], np.eye(3))
+        h2 = hum.Human(self.male1meas)
+        h2.translate_coord_sys([1, 2, 3])
+        testing.assert_allclose(h.center_of_mass, h2.center_of_mass)
+        testing.assert_allclose(h.inertia, h2.inertia, atol=1e-15)
+
+    def test_move_root(self):
+        """Changing only the root variables moves the whole body rigidly;
+        it must give the segments and solids that reorienting them does."""
+        h = hum.Human(self.male1meas)
+        h.set_CFG('CA1extension', 0.5)
+        h.set_CFG('PJ1extension', 0.3)
+        h.translate_coord_sys([0.1, 0.2, 0.3])
+        for name, value in [('somersault', 0.4), ('tilt', 0.2),
+                            ('twist', -0.3), ('somersault', 1.0)]:
+            h.set_CFG(name, value)
+        h_des = hum.Human(self.male1meas)
+        h_des.translate_coord_sys([0.1, 0.2, 0.3])
+        h_des.set_CFG_dict(dict(h.CFG))
+        testing.assert_allclose(h.mass, h_des.mass)
+        testing.assert_allclose(h.center_of_mass, h_des.center_of_mass)
+        testing.assert_allclose(h.inertia, h_des.inertia, atol=1e-14)
+        for name in hum.Human.objnames:
+            obj = h._objects[name]
+            obj_des = h_des._objects[name]
+            testing.assert_allclose(obj.pos, obj_des.pos, atol=1e-15)
+            testing.assert_allclose(obj.end_pos, obj_des.end_pos, atol=1e-15)
+            testing.assert_allclose(obj._rot_mat, obj_des._rot_mat,
+                                    atol=1e-15)
+            testing.assert_allclose(obj.center_of_mass,
+                                    obj_des.center_of_mass, atol=1e-15)
+            testing.assert_allclose(obj.inertia, obj_des.inertia, atol=1e-14)
+        # Then changing another variable starts from the moved segments.
+        h.set_CFG('J1J2flexion', 0.6)
+        h_des.set_CFG('J1J2flexion', 0.6)
+        testing.assert_allclose(h.J2.end_pos, h_des.J2.end_pos, atol=1e-15)
+        testing.assert_allclose(h.inertia, h_des.inertia, atol=1e-14)
+
+        angles = np.array([[0.0, 0.0, 0.0], [0.4, 0.2, -0.3],
+                           [1.0, -0.5, 2.0]])
+        CFGs = np.tile([h.CFG[name] for name in h.CFGnames], (3, 1))
+        CFGs[:, :3] = angles
+        for actual, expected in zip(h.calc_properties_root_batch(angles),
+                                    h.calc_properties_batch(CFGs)):
+            testing.assert_allclose(actual, expected, atol=1e-14)
+        self.assertRaises(ValueError, h.calc_properties_root_batch,
+                          np.zeros(3))
+
+    def test_lazy_solid_properties(self):
+        """The global properties of the solids are only calculated when they
+        are asked for, and are then those of the current configuration."""
+        h = hum.Human(self.male1meas)
+        solid_names = h.objnames[:len(h._body_arrays.segment_index)]
+        for CFG_name in ['CA1extension', 'somersault']:
+            h.set_CFG(CFG_name, 0.7)
+            for name in solid_names:
+                self.assertIsNone(h._objects[name]._inertia)
+                self.assertIsNone(h._objects[name]._center_of_mass)
+            h_des = hum.Human(self.male1meas)
+            h_des.set_CFG_dict(dict(h.CFG))
+            for name in solid_names:
+                solid = h._objects[name]
+                solid_des = h_des._objects[name]
+                testing.assert_allclose(solid.center_of_mass,
+                                        solid_des.center_of_mass, atol=1e-15)
+                testing.assert_allclose(solid.inertia, solid_des.inertia,
+                                        atol=1e-15)
+            self.assertIsNotNone(h._objects['a6']._inertia)
+
+        h.scale_human_by_mass(80.0)
+        h.set_densities({'thorax': 1200.0})
+        h_des.scale_human_by_mass(80.0)
+        h_des.set_densities({'thorax': 1200.0})
+        for name in ['s2', 'a3', 'k8']:
+            testing.assert_allclose(h._objects[name].inertia,
+                                    h_des._objects[name].inertia, atol=1e-15)
+        groups = np.isin(h.objnames, ['s0', 'A1', 'k8'])[np.newaxis]
+        for actual, expected in zip(h.combine_inertia_batch(groups),
+                                    h.combine_inertia(['s0', 'A1', 'k8'])):
+            testing.assert_allclose(actual[0], np.squeeze(expected),
+                                    atol=1e-14)
+
+    def test_mesh_vertices(self):
+        """The vertex buffer holds the meshes of all solids in the current
+        configuration, and the meshes of the solids are views onto it."""
+        h = hum.Human(self.male1meas)
+        h.set_CFG('somersault', 0.3)
+        h.set_CFG('CA1extension', 0.5)
+        vertices, solid_index = h.mesh_vertices()
+        num_solids = len(h._body_arrays.segment_index)
+        self.assertEqual(vertices.shape, (len(solid_index), 3))
+        testing.assert_array_equal(np.unique(solid_index),
+                                   np.arange(num_solids))
+
+        def check():
+            for index, name in enumerate(h.objnames[:num_solids]):
+                expected = h._objects[name].mesh_points()
+                actual = h._body_mesh.solid_mesh_points(index)
+                for a, e in zip(actual, expected):
+                    self.assertTrue(np.shares_memory(a, vertices))
+                    testing.assert_allclose(a, e, atol=1e-15)
+                self.assertEqual(actual[0].size,
+                                 np.count_nonzero(solid_index == index))
+        check()
+
+        # The same buffer is moved to the new configuration.
+        h.set_CFG('PJ1extension', 0.4)
+        new_vertices, new_solid_index = h.mesh_vertices()
+        self.assertIs(new_vertices, vertices)
+        check()
 
     def test_combine_inertia(self):
         """Tries input errors and checks output against some hand
@@ -1230,6 +1502,95 @@ class TestHuman(unittest.TestCase):
         testing.assert_almost_equal(c_inertia[0, 2], 0.0)
         self.assertEqual(c_inertia[1, 2], 0.0)
 
+    def test_combine_inertia_batch(self):
+        """Checks that the batched combinations match combine_inertia."""
+        h = hum.Human(self.male1meas)
+        h.set_CFG('somersault', 0.3)
+        h.set_CFG('CA1extension', 0.7)
+        h.set_CFG('PJ1extension', 0.4)
+        self.assertIs(h.get_segment_by_name('K1'), h.K1)
+        self.assertIs(h.get_segment_by_name('A1: Left'), h.A1)
+
+        combinations = [['a0', 'b0'], ['A2', 'B2'], ['P', 'T', 'C'],
+                        ['s3', 'j0', 'K2', 'b6'],
+                        list(hum.Human.objnames[40:]),
+                        ['k8']]
+        groups = [np.isin(hum.Human.objnames, objlist)
+                  for objlist in combinations]
+        masses, coms, inertias = h.combine_inertia_batch(groups)
+        self.assertEqual(masses.shape, (6,))
+        self.assertEqual(coms.shape, (6, 3))
+        self.assertEqual(inertias.shape, (6, 3, 3))
+        for objlist, mass, com, inertia_ in zip(combinations, masses, coms,
+                                                inertias):
+            c_mass, c_com, c_inertia = h.combine_inertia(objlist)
+            testing.assert_allclose(mass, c_mass)
+            testing.assert_allclose(com, c_com[:, 0], atol=1e-14)
+            testing.assert_allclose(inertia_, c_inertia, atol=1e-12)
+        testing.assert_allclose(masses[4], h.mass)
+        testing.assert_allclose(inertias[4], h.inertia, atol=1e-12)
+
+        with self.assertRaises(ValueError):
+            h.combine_inertia_batch(groups[0])
+        with self.assertRaises(ValueError):
+            h.combine_inertia_batch(np.zeros((1, 51), dtype=bool))
+        with self.assertRaises(ValueError):
+            h.combine_inertia_batch(
+                    [np.isin(hum.Human.objnames, ['k2', 'K1'])])
+
+    def test_pose_cache(self):
+        """Checks that cached poses are those calculated without the cache,
+        and that the cache is bounded and invalidated."""
+        h = hum.Human(self.male1meas)
+        h.enable_pose_cache(resolution=1e-3, maxsize=2)
+        h_des = hum.Human(self.male1meas)
+
+        def assert_same_pose(h, h_des):
+            testing.assert_allclose(h.mass, h_des.mass)
+            testing.assert_allclose(h.center_of_mass, h_des.center_of_mass)
+            testing.assert_allclose(h.inertia, h_des.inertia, atol=1e-15)
+            for name in hum.Human.objnames:
+                obj = h._objects[name]
+                obj_des = h_des._objects[name]
+                testing.assert_allclose(obj.pos, obj_des.pos, atol=1e-15)
+                testing.assert_allclose(obj.end_pos, obj_des.end_pos,
+                                        atol=1e-15)
+                testing.assert_allclose(obj.center_of_mass,
+                                        obj_des.center_of_mass, atol=1e-15)
+                testing.assert_allclose(obj.inertia, obj_des.inertia,
+                                        atol=1e-15)
+
+        for CFG in [('somersault', 0.5), ('CA1extension', 0.3),
+                    ('somersault', 0.0), ('CA1extension', 0.0)]:
+            h.set_CFG(*CFG)
+            h_des.set_CFG(*CFG)
+            assert_same_pose(h, h_des)
+        info = h.pose_cache_info()
+        self.assertEqual((info.hits, info.misses, info.evictions,
+                          info.currsize), (0, 4, 2, 2))
+
+        # Within the resolution, the pose is taken from the cache.
+        h.set_CFG('CA1extension', 0.3 + 1e-4)
+        h_des.set_CFG('CA1extension', 0.3)
+        self.assertEqual(h.pose_cache_info().hits, 1)
+        self.assertEqual(h.CFG['CA1extension'], 0.3 + 1e-4)
+        assert_same_pose(h, h_des)
+
+        # Defining the solids again (as scale_human_by_mass does) empties the
+        # cache.
+        h.meas['Ls1L'] *= 1.1
+        h.update()
+        self.assertEqual(h.pose_cache_info().currsize, 0)
+        h.set_CFG('CA1extension', 0.0)
+        self.assertEqual(h.pose_cache_info().hits, 1)
+        self.assertGreater(h.mass, h_des.mass)
+
+        h.disable_pose_cache()
+        with self.assertRaises(Exception):
+            h.pose_cache_info()
+        with self.assertRaises(ValueError):
+            h.enable_pose_cache(resolution=0.0)
+
     def test_inertia_transformed(self):
         """Tests the functionality of getting an inertia tensor about a
         different point and in a different frame.
@@ -1676,6 +2037,194 @@ class TestHuman(unittest.TestCase):
 
         testing.assert_allclose(h.K2.rot_mat, K2_R_I)
 
+    def test_incremental_update(self):
+        """Changing one joint angle redefines only the segments distal to that
+        joint, and gives the same result as redefining all segments."""
+        self.assertEqual(hum.Human._affected_segments(['K1K2flexion']),
+                set(['K2']))
+        self.assertEqual(hum.Human._affected_segments(['CA1rotation']),
+                set(['A1', 'A2']))
+        self.assertEqual(hum.Human._affected_segments(['PTbending']),
+                set(['T', 'C', 'A1', 'A2', 'B1', 'B2']))
+        self.assertEqual(len(hum.Human._affected_segments(['twist'])), 11)
+
+        h = hum.Human(self.male1meas)
+        h.set_CFG('PJ1extension', -0.3)
+        positions_before = [s.pos for s in h.segments]
+        h.set_CFG('K1K2flexion', 0.7)
+        for before, s in zip(positions_before, h.segments):
+            if s.label.startswith('K2'):
+                assert before is not s.pos
+            else:
+                assert before is s.pos
+
+        h2 = hum.Human(self.male1meas)
+        h2.CFG['PJ1extension'] = -0.3
+        h2.CFG['K1K2flexion'] = 0.7
+        h2._update_segments()
+        testing.assert_allclose(h.center_of_mass, h2.center_of_mass)
+        testing.assert_allclose(h.inertia, h2.inertia)
+        testing.assert_allclose(h.K2.center_of_mass, h2.K2.center_of_mass)
+
+    def test_relative_properties_reused(self):
+        """Changing the configuration does not recalculate the relative
+        properties of the segments; redefining the solids does."""
+        h = hum.Human(self.male1meas)
+        segments = list(h.segments)
+        arrays = h._body_arrays
+        rel_inertias = arrays.segment_rel_inertia
+
+        h.set_CFG('somersault', 0.4)
+        h.set_CFG_dict(dict((key, 0.1) for key in h.CFGnames))
+        for segment, s in zip(segments, h.segments):
+            assert segment is s
+        assert h._body_arrays is arrays
+        assert arrays.segment_rel_inertia is rel_inertias
+        # The segments are still in the right place.
+        testing.assert_allclose(h.K2.pos, h.K1.end_pos)
+        testing.assert_allclose(h.A2.rot_mat,
+                h.A1.rot_mat @ inertia.euler_123((0.1, 0.0, 0.0)))
+
+        h.update()
+        for segment, s in zip(segments, h.segments):
+            assert segment is not s
+        assert h._body_arrays is not arrays
+
+    def test_deferred_update(self):
+        """Changes made in a deferred_update block are applied once, when the
+        block exits."""
+        h = hum.Human(self.male1meas)
+        inertia_before = h.inertia
+        updates = []
+        update_segments = h._update_segments
+        def counting_update_segments(changed_CFG=None):
+            updates.append(set(changed_CFG))
+            update_segments(changed_CFG)
+        h._update_segments = counting_update_segments
+
+        with h.deferred_update():
+            h.set_CFG('CA1extension', -0.5)
+            h.set_CFG('A1A2extension', -1.0)
+            with h.deferred_update():
+                h.set_CFG('K1K2flexion', 0.3)
+            # Nested blocks do not apply the changes.
+            assert h.inertia is inertia_before
+            self.assertEqual(updates, [])
+        self.assertEqual(updates,
+                [set(['CA1extension', 'A1A2extension', 'K1K2flexion'])])
+
+        h2 = hum.Human(self.male1meas)
+        h2.set_CFG('CA1extension', -0.5)
+        h2.set_CFG('A1A2extension', -1.0)
+        h2.set_CFG('K1K2flexion', 0.3)
+        testing.assert_allclose(h.inertia, h2.inertia)
+        testing.assert_allclose(h.center_of_mass, h2.center_of_mass)
+        testing.assert_allclose(h.A2.pos, h2.A2.pos)
+
+        # Changes are applied even if the block raises.
+        with self.assertRaises(Exception):
+            with h.deferred_update():
+                h.set_CFG('CA1extension', 0.0)
+                h.set_CFG('testing', 0.1)
+        self.assertEqual(updates[-1], set(['CA1extension']))
+        testing.assert_allclose(h.A1.rot_mat, np.eye(3), atol=1e-15)
+
+    def test_calc_properties_batch(self):
+        """The batched evaluation agrees with setting each configuration in
+        turn."""
+        h = hum.Human(self.male1meas)
+        h.translate_coord_sys([0.1, -0.2, 0.3])
+
+        np.random.seed(3)
+        CFGs = np.random.uniform(-np.pi, np.pi, (5, len(h.CFGnames)))
+        CFG_before = copy.copy(h.CFG)
+
+        mass, center_of_mass, inertia_batch = h.calc_properties_batch(CFGs)
+
+        self.assertEqual(mass.shape, (5,))
+        self.assertEqual(center_of_mass.shape, (5, 3))
+        self.assertEqual(inertia_batch.shape, (5, 3, 3))
+        # Const.
+        self.assertEqual(h.CFG, CFG_before)
+
+        # Suppress the printing of out-of-range joint angles.
+        old_stdout = sys.stdout
+        sys.stdout = StringIO()
+        try:
+            for i, row in enumerate(CFGs):
+                h.set_CFG_dict(dict(zip(h.CFGnames, row)))
+                testing.assert_allclose(mass[i], h.mass)
+                testing.assert_allclose(center_of_mass[i],
+                        h.center_of_mass[:, 0], atol=1e-14)
+                testing.assert_allclose(inertia_batch[i], h.inertia,
+                        atol=1e-13)
+        finally:
+            sys.stdout = old_stdout
+
+        self.assertRaises(ValueError, h.calc_properties_batch,
+                np.zeros((5, 20)))
+
+    def test_calc_properties_jacobian(self):
+        """The exact derivatives agree with central differences of
+        calc_properties_batch."""
+        h = hum.Human(self.male1meas, symmetric=False)
+        h.translate_coord_sys([0.1, -0.2, 0.3])
+
+        np.random.seed(4)
+        CFGs = np.random.uniform(-np.pi, np.pi, (4, len(h.CFGnames)))
+        mass, center_of_mass, inertia_, d_center_of_mass, d_inertia = \
+                h.calc_properties_jacobian(CFGs)
+        self.assertEqual(d_center_of_mass.shape, (4, 3, 21))
+        self.assertEqual(d_inertia.shape, (4, 3, 3, 21))
+        for expected, actual in zip(h.calc_properties_batch(CFGs),
+                                    [mass, center_of_mass, inertia_]):
+            testing.assert_array_equal(actual, expected)
+
+        step = 1e-6
+        for k in range(len(h.CFGnames)):
+            CFGs_plus = CFGs.copy()
+            CFGs_plus[:, k] += step
+            CFGs_minus = CFGs.copy()
+            CFGs_minus[:, k] -= step
+            _, com_plus, inertia_plus = h.calc_properties_batch(CFGs_plus)
+            _, com_minus, inertia_minus = h.calc_properties_batch(CFGs_minus)
+            testing.assert_allclose(d_center_of_mass[..., k],
+                    (com_plus - com_minus) / (2 * step), atol=1e-8)
+            testing.assert_allclose(d_inertia[..., k],
+                    (inertia_plus - inertia_minus) / (2 * step), atol=1e-7)
+
+        self.assertRaises(ValueError, h.calc_properties_jacobian,
+                np.zeros(21))
+
+    @unittest.skipIf(os.environ.get('YEADON_SKIP_SLOW_TESTS'),
+                     "slow; YEADON_SKIP_SLOW_TESTS is set")
+    def test_thread_pool(self):
+        """Builds, scales, and poses many humans at once in threads; each
+        must be the human built alone."""
+        scalemeas = os.path.join(os.path.split(__file__)[0],
+                                 'male1_scale.txt')
+
+        def build(i):
+            h = hum.Human(scalemeas if i % 2 else self.male1meas,
+                          density_set=('Dempster', 'Chandler')[i % 4 // 2])
+            if i % 8 // 4:
+                h.scale_human_by_mass(60.0)
+            h.set_CFG('somersault', 0.01 * (i % 8))
+            return h.mass, h.center_of_mass, h.inertia
+
+        # Each of the 8 variants is built 25 times, by 8 threads at once, so
+        # that state shared by the humans is used concurrently.
+        num_humans = 200
+        with futures.ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(build, range(num_humans)))
+        # The humans only depend on i modulo 8.
+        expected = [build(i) for i in range(8)]
+        for i, (mass, center_of_mass, inertia_) in enumerate(results):
+            mass_des, center_of_mass_des, inertia_des = expected[i % 8]
+            self.assertEqual(mass, mass_des)
+            testing.assert_array_equal(center_of_mass, center_of_mass_des)
+            testing.assert_array_equal(inertia_, inertia_des)
+
 # TODO compare ISEG output to our output.
 
 # TODO try out a program flow: make sure we do all necessary updates after
@@ -0,0 +1,50 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+packagedir = os.path.join(os.path.split(__file__)[0], '..', '..')
+
+# Time, in seconds, that importing yeadon may take once numpy is imported.
+IMPORT_BUDGET = 0.5
+
+# Modules that are only needed to draw or to read and write files.
+LAZY_MODULES = ['mayavi', 'traits', 'tvtk', 'vtk', 'yaml']
+
+SCRIPT = """
+import json
+import sys
+import time
+
+import numpy
+
+start = time.perf_counter()
+import yeadon
+duration = time.perf_counter() - start
+print(json.dumps({'duration': duration,
+                  'modules': sorted(name.split('.')[0]
+                                    for name in sys.modules)}))
+"""
+
+
+class TestImport(unittest.TestCase):
+    """Importing yeadon in a new interpreter must be fast, and must not
+    import the modules that are only needed to draw or for file I/O."""
+
+    def test_import_budget(self):
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(
+                [os.path.abspath(packagedir)] +
+                [path for path in [env.get('PYTHONPATH')] if path])
+        # The best of a few runs, so that a busy machine does not fail the
+        # test.
+        durations = []
+        for i in range(3):
+            output = subprocess.check_output([sys.executable, '-c', SCRIPT],
+                                             env=env)
+            result = json.loads(output.decode().splitlines()[-1])
+            durations.append(result['duration'])
+            for name in LAZY_MODULES:
+                self.assertNotIn(name, result['modules'])
+        self.assertLess(min(durations), IMPORT_BUDGET)
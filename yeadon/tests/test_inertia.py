@@ -4,7 +4,9 @@
 import warnings
 
 # external
-from numpy import testing, pi, sin, cos, zeros, array, arctan
+from numpy import (testing, pi, sin, cos, zeros, array, arctan, eye,
+                   linspace, stack, newaxis)
+from numpy.linalg import det
 from numpy.random import random
 
 # local
@@ -59,6 +61,19 @@ def test_rotations():
     testing.assert_allclose(R, inertia.euler_123(angles))
 
 
+def test_rotations_batched():
+    angles = 2 * pi * random((4, 5, 3)) - pi
+
+    for function in [inertia.rotate_space_123, inertia.euler_123]:
+        R = function(angles)
+        assert R.shape == (4, 5, 3, 3)
+        for i in range(4):
+            for j in range(5):
+                testing.assert_array_equal(R[i, j], function(angles[i, j]))
+        testing.assert_allclose(R @ R.swapaxes(-1, -2),
+                                zeros((4, 5, 3, 3)) + eye(3), atol=1e-14)
+
+
 def test_parallel_axis():
     """Only covers the case that the inertia tensor is diagonal."""
 
@@ -98,6 +113,32 @@ def test_parallel_axis():
 # TODO : test parallel_axis, additional (non-diagonal) cases
 
 
+def test_parallel_axis_batched():
+    inertias = random((4, 3, 3))
+    masses = random(4)
+    dpos = random((4, 3))
+
+    inertia2 = inertia.parallel_axis(inertias, masses, dpos)
+    assert inertia2.shape == (4, 3, 3)
+    for i in range(4):
+        testing.assert_array_equal(inertia2[i], inertia.parallel_axis(
+            inertias[i], masses[i], dpos[i]))
+
+    # One body, many points.
+    inertia2 = inertia.parallel_axis(inertias[0], masses[0], dpos)
+    for i in range(4):
+        testing.assert_array_equal(inertia2[i], inertia.parallel_axis(
+            inertias[0], masses[0], dpos[i]))
+
+    # Column and row vectors are still accepted for a single body.
+    testing.assert_array_equal(
+        inertia.parallel_axis(inertias[0], masses[0], dpos[0].reshape(3, 1)),
+        inertia.parallel_axis(inertias[0], masses[0], dpos[0]))
+    testing.assert_array_equal(
+        inertia.parallel_axis(inertias[0], masses[0], dpos[0].reshape(1, 3)),
+        inertia.parallel_axis(inertias[0], masses[0], dpos[0]))
+
+
 def test_rotate_inertia():
     """Ensures that expressing an inertia tensor with respect to another
     frame is correct."""
@@ -158,3 +199,48 @@ def test_rotate_inertia():
                           [0.0, 0.0, 10.0]])
 
     testing.assert_allclose(I_b, expected_I_b, atol=1e-14)
+
+
+def test_rotate_inertia_batched():
+    R = inertia.euler_123(pi * random((2, 5, 3)))
+    I_a = random((5, 3, 3))
+
+    I_b = inertia.rotate_inertia(R, I_a)
+    assert I_b.shape == (2, 5, 3, 3)
+    for i in range(2):
+        for j in range(5):
+            testing.assert_allclose(I_b[i, j],
+                                    inertia.rotate_inertia(R[i, j], I_a[j]),
+                                    rtol=1e-14)
+
+
+def test_principal_axes_batch():
+    # A body whose second moment crosses the other two while it rotates.
+    t = linspace(0.0, 4.0, 401)
+    R = inertia.euler_123(stack([0.9 * t, 0.4 * sin(t), 0.3 * t], axis=-1))
+    moments = stack([1.0 + 0.0 * t, 1.5 + sin(2 * t), 2.2 + 0.0 * t],
+                    axis=-1)
+    I = R.swapaxes(-1, -2) @ (moments[..., newaxis] * eye(3)) @ R
+
+    Ip, C = inertia.principal_axes_batch(I)
+    for i in [0, 100, 200]:
+        Ip_single, C_single = inertia.principal_axes(I[i])
+        testing.assert_allclose(Ip[i], Ip_single)
+        testing.assert_allclose(abs(C[i]), abs(C_single), atol=1e-12)
+    testing.assert_allclose(det(C), 1.0)
+    # Sorted moments swap axes where they cross.
+    assert (C[1:] * C[:-1]).sum(axis=-1).min() < 0.0
+
+    Ip, C = inertia.principal_axes_batch(I, continuous=True)
+    testing.assert_allclose(Ip, moments, atol=1e-12)
+    testing.assert_allclose(abs((C * R).sum(axis=-1)), 1.0)
+    assert (C[1:] * C[:-1]).sum(axis=-1).min() > 0.99
+    testing.assert_allclose(det(C), 1.0)
+    testing.assert_allclose(C.swapaxes(-1, -2) @ (Ip[..., newaxis] * eye(3))
+                            @ C, I, atol=1e-12)
+
+    # A single tensor is not a sequence of frames.
+    testing.assert_raises(ValueError, inertia.principal_axes_batch, I[0],
+                          continuous=True)
+    Ip, C = inertia.principal_axes_batch(I[:1], continuous=True)
+    testing.assert_allclose(Ip[0], inertia.principal_axes(I[0])[0])
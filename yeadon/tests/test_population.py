@@ -0,0 +1,207 @@
+import os
+import sys
+import warnings
+from io import StringIO
+
+import unittest
+import numpy as np
+from numpy import testing
+
+import yeadon.human as hum
+from yeadon.population import Population, measurement_jacobian
+
+warnings.filterwarnings('ignore', category=DeprecationWarning)
+
+
+class TestPopulation(unittest.TestCase):
+    """Tests the :py:class:`Population` class."""
+
+    male1meas = os.path.join(os.path.split(__file__)[0], '..', '..',
+            'misc', 'samplemeasurements', 'male1.txt')
+
+    def setUp(self):
+        h = hum.Human(self.male1meas, symmetric=False)
+        self.meas = dict(h.meas)
+        self.meas_array = np.array([self.meas[name]
+                                    for name in hum.Human.measnames])
+
+    def assert_matches_human(self, population, index, h):
+        testing.assert_allclose(population.mass[index], h.mass)
+        testing.assert_allclose(population.center_of_mass[index],
+                                h.center_of_mass[:, 0], atol=1e-15)
+        testing.assert_allclose(population.inertia[index], h.inertia,
+                                atol=1e-14)
+        for i, name in enumerate(population.segment_names):
+            segment = h.get_segment_by_name(name)
+            testing.assert_allclose(population.segment_mass[index, i],
+                                    segment.mass)
+            testing.assert_allclose(
+                    population.segment_center_of_mass[index, i],
+                    segment.center_of_mass[:, 0], atol=1e-15)
+            testing.assert_allclose(population.segment_inertia[index, i],
+                                    segment.inertia, atol=1e-14)
+
+    def test_same_as_human(self):
+        scales = np.array([1.0, 1.1, 0.9])
+        measurements = scales[:, np.newaxis] * self.meas_array
+        CFG = dict((name, 0.0) for name in hum.Human.CFGnames)
+        CFG['somersault'] = 0.3
+        CFG['CA1extension'] = -0.4
+        CFG['A1A2extension'] = -0.5
+        CFG['J1J2flexion'] = 0.6
+        CFG['PTbending'] = 0.2
+
+        for symmetric in [True, False]:
+            population = Population(measurements,
+                    CFG=[CFG[name] for name in hum.Human.CFGnames],
+                    symmetric=symmetric)
+            self.assertEqual(population.mass.shape, (3,))
+            self.assertEqual(population.center_of_mass.shape, (3, 3))
+            self.assertEqual(population.inertia.shape, (3, 3, 3))
+            self.assertEqual(population.segment_inertia.shape,
+                             (3, 11, 3, 3))
+            for index, scale in enumerate(scales):
+                h = hum.Human(dict((key, scale * val) for key, val in
+                                   self.meas.items()),
+                              CFG=CFG, symmetric=symmetric)
+                self.assert_matches_human(population, index, h)
+
+    def test_masses_and_density_set(self):
+        densities = hum.Human.segmental_densities
+        old_densities = dict((key, dict(val)) for key, val in
+                             densities.items())
+        population = Population(np.array([self.meas_array] * 2),
+                                masses=[70.0, 90.0], density_set='Chandler')
+        # The densities of the Human class are left alone.
+        self.assertEqual(densities, old_densities)
+        testing.assert_allclose(population.mass, [70.0, 90.0])
+        try:
+            h = hum.Human(self.meas, density_set='Chandler')
+            h.scale_human_by_mass(90.0)
+        finally:
+            for key, val in old_densities.items():
+                densities[key].update(val)
+        self.assert_matches_human(population, 1, h)
+
+    def test_invalid_stadium(self):
+        """Stadia that are defined incorrectly become circles, as in
+        Human."""
+        self.meas['Lj8p'] = 3.5 * self.meas['Lj8w']
+        measurements = np.array([self.meas_array,
+                                 [self.meas[name]
+                                  for name in hum.Human.measnames]])
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            population = Population(measurements, symmetric=False)
+        assert any("'Lj8: ball'" in str(x.message) for x in w)
+
+        old_stdout = sys.stdout
+        sys.stdout = StringIO()
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                h = hum.Human(self.meas, symmetric=False)
+        finally:
+            sys.stdout = old_stdout
+        self.assert_matches_human(population, 1, h)
+
+    def test_measurement_jacobian(self):
+        """The complex-step derivatives agree with central differences of
+        Human, including derived measurements and the averaging of the
+        limbs."""
+        CFG = dict((name, 0.0) for name in hum.Human.CFGnames)
+        CFG['CA1extension'] = -0.5
+        CFG['PTbending'] = 0.3
+        h = hum.Human(self.meas, CFG=CFG)
+        h.rotate_coord_sys([0.3, 0.2, 0.1])
+        mass_jac, com_jac, inertia_jac = h.calc_measurement_jacobian()
+        self.assertEqual(mass_jac.shape, (95,))
+        self.assertEqual(com_jac.shape, (3, 95))
+        self.assertEqual(inertia_jac.shape, (3, 3, 95))
+
+        step = 1e-6
+        # Ls4w and Ls4d define Ls5, Ls0p defines Lj0p and Lk0p, and La3p
+        # and Lb3p are averaged.
+        for name in ['Ls4w', 'Ls4d', 'Ls0p', 'La3p', 'Lb3p', 'Lk5L']:
+            properties = []
+            for sign in [1.0, -1.0]:
+                meas = dict(self.meas)
+                meas[name] += sign * step
+                other = hum.Human(meas, CFG=CFG)
+                other.rotate_coord_sys([0.3, 0.2, 0.1])
+                properties.append((other.mass, other.center_of_mass[:, 0],
+                                   other.inertia))
+            i = hum.Human.measnames.index(name)
+            for j, jacobian in enumerate([mass_jac, com_jac, inertia_jac]):
+                testing.assert_allclose(jacobian[..., i],
+                        (properties[0][j] - properties[1][j]) / (2 * step),
+                        atol=1e-7)
+
+        # The mass is held fixed if it is given.
+        results = measurement_jacobian([self.meas_array] * 2,
+                                       masses=[70.0, 80.0])
+        testing.assert_allclose(results[0], [70.0, 80.0])
+        testing.assert_allclose(results[3], 0.0, atol=1e-10)
+
+    def test_measurement_jacobian_of_scaled_human(self):
+        """The derivatives of a human scaled to a measured mass, or with
+        densities of its own, are those of that human."""
+        male4meas = os.path.join(os.path.split(__file__)[0], '..', '..',
+                'misc', 'samplemeasurements', 'male4.txt')
+        h = hum.Human(male4meas)
+        self.assertTrue(h.meas_mass > 0)
+        h.set_CFG('CA1extension', -0.5)
+        mass_jac, com_jac, inertia_jac = h.calc_measurement_jacobian()
+
+        step = 1e-6
+        for name in ['Lj2p', 'Ls4w', 'La3p']:
+            i = hum.Human.measnames.index(name)
+            properties = []
+            for sign in [1.0, -1.0]:
+                meas = dict(h.meas)
+                meas[name] += sign * step
+                other = hum.Human(meas, CFG=h.CFG)
+                # As Human.scale_human_by_mass, without its check of the
+                # mass rounded to grams, which 78.745 kg straddles.
+                other._scale_density(h.meas_mass / other.mass)
+                properties.append((other.mass, other.center_of_mass[:, 0],
+                                   other.inertia))
+            for j, jacobian in enumerate([mass_jac, com_jac, inertia_jac]):
+                testing.assert_allclose(jacobian[..., i],
+                        (properties[0][j] - properties[1][j]) / (2 * step),
+                        atol=1e-7)
+        testing.assert_allclose(mass_jac, 0.0, atol=1e-10)
+
+        # Densities set on the human are held fixed instead.
+        h.set_densities({'thigh': 1200.0})
+        mass_jac, com_jac, inertia_jac = h.calc_measurement_jacobian()
+        i = hum.Human.measnames.index('Lj2p')
+        properties = []
+        for sign in [1.0, -1.0]:
+            meas = dict(h.meas)
+            meas['Lj2p'] += sign * step
+            other = hum.Human(meas, CFG=h.CFG)
+            other.set_densities(h.solid_densities)
+            properties.append((other.mass, other.inertia))
+        testing.assert_allclose(mass_jac[i],
+                (properties[0][0] - properties[1][0]) / (2 * step), atol=1e-7)
+        testing.assert_allclose(inertia_jac[..., i],
+                (properties[0][1] - properties[1][1]) / (2 * step), atol=1e-7)
+
+    def test_densities(self):
+        h = hum.Human(self.meas, symmetric=False)
+        h.set_densities({'thorax': 1100.0, 'foot': 1050.0})
+        population = Population([self.meas_array], symmetric=False,
+                                densities=h.solid_densities)
+        self.assert_matches_human(population, 0, h)
+
+    def test_bad_input(self):
+        self.assertRaises(ValueError, Population, self.meas_array)
+        self.assertRaises(ValueError, Population,
+                          np.zeros((2, len(hum.Human.measnames))))
+        self.assertRaises(ValueError, Population, [self.meas_array],
+                          CFG=np.zeros(3))
+        self.assertRaises(Exception, Population, [self.meas_array],
+                          density_set='Foo')
+        self.assertRaises(ValueError, Population, [self.meas_array],
+                          densities=np.ones(3))
@@ -5,9 +5,10 @@ import os
 import unittest
 import warnings
 
-from numpy import testing, pi, array, sin, cos, zeros, array, arctan
+from numpy import testing, pi, array, sin, cos, zeros, array, arctan, diag
 
-from yeadon.solid import Stadium, Solid, StadiumSolid
+from yeadon.solid import (Stadium, Solid, StadiumSolid, Semiellipsoid,
+                          stadium_solid_properties)
 from yeadon import inertia
 
 warnings.filterwarnings('ignore', category=DeprecationWarning)
@@ -154,6 +155,8 @@ class TestStadium(unittest.TestCase):
         testing.assert_almost_equal(p.width, perimeter / pi)
         testing.assert_almost_equal(p.thickness, 0.0)
         testing.assert_almost_equal(p.radius, perimeter / 2.0 / pi)
+        # The perimeter is that of the circle, found from the radius.
+        assert p.perimeter == 2.0 * pi * p.radius
 
         # radius
         radius = 1.0
@@ -257,6 +260,28 @@ class TestStadium(unittest.TestCase):
 
         sys.stdout = actual_stdout
 
+    def test_array_stadium(self):
+        """A stadium of arrays, one element per human, matches the stadia of
+        the elements, including the ones set as circles."""
+        perimeters = array([2.5, 1.9, 3.15])
+        width = 1.0
+        actual_stdout = sys.stdout
+        sys.stdout = open(os.devnull, 'w')
+        try:
+            with warnings.catch_warnings(record=True) as w:
+                warnings.simplefilter("always")
+                stad = Stadium('Lb1: mid-arm', 'perimwidth', perimeters,
+                               width)
+                assert len(w) == 1
+                assert "for 2 human(s)" in str(w[-1].message)
+                stads = [Stadium('Lb1: mid-arm', 'perimwidth', perimeter,
+                                 width) for perimeter in perimeters]
+        finally:
+            sys.stdout = actual_stdout
+        for name in ['radius', 'thickness', 'perimeter', 'width']:
+            testing.assert_array_equal(getattr(stad, name),
+                    [getattr(single, name) for single in stads])
+
 
 def test_solid():
     label = 'Test'
@@ -291,6 +316,41 @@ def test_solid():
 
     #TODO: complete tests for solid and the remaining classes in solid.py
 
+def test_mesh_points():
+    stad0 = Stadium('Ls1: umbilicus', 'thicknessradius', 0.1, 0.05)
+    stad1 = Stadium('Lb1: mid-arm', 'thicknessradius', 0.05, 0.1, 'AP')
+    stadsol = StadiumSolid('stadsol', 1000.0, stad0, stad1, 0.3)
+    semi = Semiellipsoid('semi', 1000.0, 0.6, 0.2)
+    position = array([[1.0], [2.0], [3.0]])
+    C = inertia.rotate_space_123((0.3, -0.2, 0.1))
+
+    for sol in (stadsol, semi):
+        # The mesh is not made until it is asked for.
+        assert sol._unrotated_mesh is None
+        sol.set_orientation(position, C, True)
+        assert sol._unrotated_mesh is None
+
+    X, Y, Z = stadsol.mesh_points()
+    assert X.shape == (2, 20)
+    mesh = stadsol._unrotated_mesh
+    assert mesh is not None
+    stadsol.mesh_points()
+    assert stadsol._unrotated_mesh is mesh
+    # The stadia are at either end of the solid, and the upper one is aligned
+    # anteroposteriorly.
+    local = C.T @ (array([X.ravel(), Y.ravel(), Z.ravel()]) - position)
+    testing.assert_allclose(local[2], [0.0] * 20 + [0.3] * 20, atol=1e-15)
+    testing.assert_allclose(local[:2, 20], [0.0, 0.15], atol=1e-15)
+
+    x, y, z = semi.mesh_points()
+    n = Semiellipsoid.n_mesh_points
+    assert x.shape == (n, n)
+    # Every point lies on the surface of the semiellipsoid.
+    local = C.T @ (array([x.ravel(), y.ravel(), z.ravel()]) - position)
+    testing.assert_allclose((local[0] ** 2 + local[1] ** 2) / semi.radius ** 2
+                            + local[2] ** 2 / semi.height ** 2, 1.0)
+    assert (local[2] >= -1e-12).all()
+
 def test_stadiumsolid_inertial_properties():
     """Checks the inertial property calculations of the StadiumSolid."""
 
@@ -458,6 +518,55 @@ def test_degenerate_stadiumsolid_symmetry():
     # A third case for when both t0 and t0 are zero.
     # TODO
 
+def test_stadium_solid_properties():
+    """Checks the vectorized kernel against StadiumSolidCheck, and its
+    handling of the degenerate and anteroposterior cases against StadiumSolid
+    objects and inertia.rotate_inertia."""
+
+    density = 1.5
+    height = 4
+    r0 = array([3.0, 1.0, 5.0, 3.0, 3.0])
+    t0 = array([1.0, 2.0, 0.0, 0.0, 1.0])
+    r1 = array([1.0, 3.0, 2.0, 2.0, 1.0])
+    t1 = array([2.0, 1.0, 2.0, 0.0, 2.0])
+    alignment = array(['ML', 'ML', 'ML', 'ML', 'AP'])
+    mass, zcom, moments = stadium_solid_properties(r0, t0, r1, t1, height,
+            density, alignment)
+    assert mass.shape == (5,)
+    assert zcom.shape == (5,)
+    assert moments.shape == (5, 3)
+
+    for i in range(2):
+        solid_des = StadiumSolidCheck(density, t0[i], r0[i], t1[i], r1[i],
+                                      height)
+        testing.assert_almost_equal(mass[i], solid_des.mass())
+        testing.assert_almost_equal(zcom[i], solid_des.mass_center())
+        testing.assert_almost_equal(moments[i], [solid_des.inertia_xx(),
+            solid_des.inertia_yy(), solid_des.inertia_zz()])
+
+    # A StadiumSolid, which computes its properties with floats, agrees with
+    # the kernel, including in the degenerate cases.
+    for i in range(4):
+        solid = StadiumSolid('solid', density,
+                Stadium('Ls1: umbilicus', 'thicknessradius', t0[i], r0[i]),
+                Stadium('Lb1: mid-arm', 'thicknessradius', t1[i], r1[i]),
+                height)
+        testing.assert_almost_equal(mass[i], solid.mass)
+        testing.assert_almost_equal(zcom[i], solid.rel_center_of_mass[2, 0])
+        testing.assert_almost_equal(moments[i], solid.rel_inertia.diagonal())
+
+    # Anteroposterior solids are rotated by pi/2 about z.
+    testing.assert_allclose(inertia.rotate_inertia(
+        inertia.rotate_space_123([0, 0, pi / 2]), diag(moments[0])),
+        diag(moments[4]), atol=1e-10)
+
+    # Arguments broadcast.
+    mass, zcom, moments = stadium_solid_properties(r0, t0, r1, t1,
+            array([[1.0], [2.0]]), density)
+    assert mass.shape == (2, 5)
+    assert moments.shape == (2, 5, 3)
+    testing.assert_allclose(mass[1], 2.0 * mass[0])
+
 def test_stadiumsolidcheck_against_truncated_cone():
     """Tests the StadiumSolidCheck formulae above against truncated cone
     formulae for degenerate stadia; using a thin trapezium."""
@@ -5,8 +5,6 @@ import os
 
 import numpy as np
 
-from . import inertia
-
 from . import human as hum
 
 
@@ -149,14 +147,14 @@ def start_ui():
             thetx = input("Angle (rad) about your x-axis: ")
             thety = input("Angle (rad) about your y-axis: ")
             thetz = input("Angle (rad) about your z-axis: ")
-            H.rotate_coord_sys(inertia.rotate_space_123(thetx,thety,thetz))
+            H.rotate_coord_sys([float(thetx), float(thety), float(thetz)])
             print("Now we'll specify the position of yeadon with respect to "
                   "your coordinate system. You will provide the three "
                   "components, x y and z, in YOUR coordinates.")
             posx = input("X-position (m): ")
             posy = input("Y-position (m): ")
             posz = input("Z-position (m): ")
-            H.translate_coord_sys( (posx,posy,posz) )
+            H.translate_coord_sys([float(posx), float(posy), float(posz)])
             print("All done!")
 
         # DRAW HUMAN WITH MAYAVI
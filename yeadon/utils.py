@@ -3,7 +3,6 @@
 import contextlib
 
 import numpy as np
-import numpy.core.arrayprint as arrayprint
 
 
 @contextlib.contextmanager
@@ -16,7 +15,7 @@ def printoptions(**kwargs):
 
     """
 
-    original = np.get_printoptions()
-    np.set_printoptions(**kwargs)
-    yield
-    np.set_printoptions(**original)
+    # np.printoptions is local to the thread (and context) in recent versions
+    # of NumPy, so humans can be printed from several threads at once.
+    with np.printoptions(**kwargs):
+        yield